@@ -1,16 +1,37 @@
+import os
 import streamlit as st
-from navigation.routes import ROUTES
+from navigation.routes import get_page
 from navigation.navigation import navbar
+from utils.metrics import configure_logging, logger, start_metrics_server
+
+
+@st.cache_resource
+def metrics_endpoint():
+    """Configures metric logging and starts the Prometheus endpoint once per process if METRICS_PORT is set."""
+    configure_logging()
+
+    port = os.getenv("METRICS_PORT")
+    if not port:
+        return None
+
+    try:
+        return start_metrics_server(int(port))
+    except OSError as e:
+        # Returning None caches the failure, so reruns do not retry the bind
+        logger.error("Metrics endpoint not started on port %s: %s", port, e)
+        return None
+
 
 def main():    
     st.set_page_config(layout="wide")  
+    metrics_endpoint()
 
     if "page" not in st.session_state:
         st.session_state["page"] = "home"
 
     navbar()
 
-    ROUTES[st.session_state["page"]]()
+    get_page(st.session_state["page"])()
 
 
 
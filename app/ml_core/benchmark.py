@@ -0,0 +1,256 @@
+"""
+Training throughput benchmark for registered models.
+
+Sweeps batch size, DataLoader workers, torch threads and precision, running
+each configuration in a fresh process so peak RSS is measured per run.
+
+Usage (from the app directory):
+    python -m ml_core.benchmark --model "CNN Transformer" --batch-sizes 32,128 \\
+        --workers 0,2,4 --threads 1,4 --precision fp32,bf16 --synthetic --out bench.csv
+"""
+
+import gc
+import csv
+import sys
+import json
+import time
+import queue
+import resource
+import argparse
+import itertools
+import multiprocessing as mp
+
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, TensorDataset
+
+
+def synthetic_dataset(example, num_samples=2048, num_classes=10):
+    """
+    Random inputs shaped like `example` (without its batch dimension) and random labels.
+    """
+    inputs = torch.randn(num_samples, *example.shape[1:])
+    labels = torch.randint(0, num_classes, (num_samples,))
+    return TensorDataset(inputs, labels)
+
+
+def load_train_loader(Model, loader_config, synthetic):
+    """
+    The model's own training loader built with `loader_config`, so the real
+    pipeline (collate, normalisation) is measured, or a loader over synthetic
+    data if requested or the real data is unavailable.
+
+    Returns:
+        loader, source: The DataLoader and "real" or "synthetic".
+    """
+    if not synthetic:
+        try:
+            train_loader, _ = Model.get_dataloader(loader_config)
+            return train_loader, "real"
+        except Exception as e:
+            print(f"Falling back to synthetic data: {e}", file=sys.stderr)
+
+    dataset = synthetic_dataset(Model.example_input())
+    return DataLoader(dataset, drop_last=True, **loader_config.dataloader_kwargs(shuffle=True)), "synthetic"
+
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process plus its largest finished child, in MB.
+    Children only count once they have exited and been reaped, so shut down
+    DataLoader workers before calling this.
+    """
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (own + children) / scale
+
+
+def _repeat(loader):
+    # Unlike itertools.cycle, this does not keep every batch in memory
+    while True:
+        yield from loader
+
+
+def run_config(model_name, batch_size, num_workers, num_threads, precision, steps, warmup, synthetic):
+    """
+    Train for `steps` batches with one configuration and measure it.
+
+    Returns:
+        dict: The configuration plus samples/sec, data-wait fraction and peak RSS.
+    """
+    import ml_core  # noqa: F401  (registers the bundled models)
+    from ml_core.registry import ModelRegistry
+    from ml_core.loader_config import LoaderConfig
+
+    torch.set_num_threads(num_threads)
+
+    Model = ModelRegistry.get(model_name)
+    model = Model.build()
+    model.train()
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01, momentum=0.9)
+
+    loader_config = LoaderConfig(
+        batch_size=batch_size,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0,
+        pin_memory=torch.cuda.is_available(),
+    )
+    loader, source = load_train_loader(Model, loader_config, synthetic)
+
+    autocast = torch.autocast("cpu", dtype=torch.bfloat16, enabled=precision == "bf16")
+
+    data_time, compute_time, samples = 0.0, 0.0, 0
+    batches = _repeat(loader)
+
+    for step in range(steps + warmup):
+        start = time.perf_counter()
+        x, y = next(batches)
+        loaded = time.perf_counter()
+
+        optimizer.zero_grad()
+        with autocast:
+            loss = F.cross_entropy(model(x), y)
+        loss.backward()
+        optimizer.step()
+        done = time.perf_counter()
+
+        if step >= warmup:
+            data_time += loaded - start
+            compute_time += done - loaded
+            samples += len(y)
+
+    # Shut the persistent workers down so they are reaped and show up in RUSAGE_CHILDREN
+    del batches, loader
+    gc.collect()
+
+    total = data_time + compute_time
+    return {
+        "model": model_name,
+        "data": source,
+        "batch_size": batch_size,
+        "num_workers": num_workers,
+        "num_threads": num_threads,
+        "precision": precision,
+        "steps": steps,
+        "samples_per_sec": samples / total if total else 0.0,
+        "data_wait_fraction": data_time / total if total else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _worker(results, *args):
+    try:
+        results.put(run_config(*args))
+    except Exception as e:
+        results.put({"error": repr(e)})
+
+
+def wait_for_result(results, process, timeout=None):
+    """
+    Wait for `process` to put its result on `results`, without hanging if it dies.
+
+    Args:
+        results: Queue the process reports on.
+        process: The running benchmark process.
+        timeout: Seconds before the process is terminated; None waits indefinitely.
+
+    Returns:
+        dict: The result, or {"error": ...} if the process crashed, was killed
+        (e.g. out of memory) or timed out.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            pass
+
+        if not process.is_alive():
+            # The result may have been flushed just before the process exited
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                return {"error": f"Benchmark process exited with code {process.exitcode}"}
+
+        if deadline is not None and time.monotonic() > deadline:
+            process.terminate()
+            return {"error": f"Timed out after {timeout}s"}
+
+
+def run_sweep(
+    model_name, batch_sizes, workers, threads, precisions, steps=50, warmup=5, synthetic=False, timeout=None
+):
+    """
+    Run every combination of the swept parameters, one process per configuration.
+    A configuration that crashes or exceeds `timeout` seconds is recorded as a failed row.
+
+    Returns:
+        list: One result dict per configuration.
+    """
+    ctx = mp.get_context("spawn")
+    rows = []
+
+    for batch_size, num_workers, num_threads, precision in itertools.product(
+        batch_sizes, workers, threads, precisions
+    ):
+        results = ctx.Queue()
+        process = ctx.Process(
+            target=_worker,
+            args=(results, model_name, batch_size, num_workers, num_threads, precision, steps, warmup, synthetic),
+        )
+        process.start()
+        row = wait_for_result(results, process, timeout)
+        process.join()
+
+        if "error" in row:
+            row.update(batch_size=batch_size, num_workers=num_workers, num_threads=num_threads, precision=precision)
+        rows.append(row)
+        print(json.dumps(row), file=sys.stderr)
+
+    return rows
+
+
+def write_results(rows, path):
+    """
+    Write results as CSV if `path` ends with .csv, otherwise as JSON.
+    """
+    if path.endswith(".csv"):
+        fields = sorted({key for row in rows for key in row})
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+if __name__ == "__main__":
+    import ml_core  # noqa: F401
+    from ml_core.registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description="Benchmark training throughput of a registered model.")
+    parser.add_argument("--model", required=True, choices=ModelRegistry.list_models())
+    parser.add_argument("--batch-sizes", type=_int_list, default=[32, 64, 128])
+    parser.add_argument("--workers", type=_int_list, default=[0, 2])
+    parser.add_argument("--threads", type=_int_list, default=[torch.get_num_threads()])
+    parser.add_argument("--precision", type=lambda v: v.split(","), default=["fp32"])
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true", help="Use random data instead of the real dataset.")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per configuration.")
+    parser.add_argument("--out", default="benchmark.json")
+    args = parser.parse_args()
+
+    rows = run_sweep(
+        args.model, args.batch_sizes, args.workers, args.threads, args.precision,
+        steps=args.steps, warmup=args.warmup, synthetic=args.synthetic, timeout=args.timeout,
+    )
+    write_results(rows, args.out)
+    print(f"Wrote {len(rows)} results to {args.out}")
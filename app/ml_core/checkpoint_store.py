@@ -0,0 +1,170 @@
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+
+def run_key(model_name, dataset, hparams):
+    """
+    Identifies a training configuration; runs with the same key are interchangeable.
+
+    Args:
+        model_name: Name in the `ModelRegistry`.
+        dataset: Dataset name.
+        hparams: Dict of hyperparameters.
+
+    Returns:
+        str: SHA-256 hex digest of the configuration.
+    """
+    config = json.dumps({"model": model_name, "dataset": dataset, "hparams": hparams}, sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remove_checkpoint_files(ckpt_path):
+    """
+    Delete a checkpoint and the artifacts stored next to it, i.e. every
+    `<stem>.*` file such as the `ml_core.optimize` `.pt`, `.json` and `.onnx` outputs.
+    Files that are already gone are skipped.
+    """
+    stem, _ = os.path.splitext(ckpt_path)
+    for path in glob.glob(glob.escape(stem) + ".*"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class CheckpointStore:
+    """
+    Content-addressed store of trained checkpoints with a JSON index.
+
+    Each entry records the model, dataset, hyperparameters, content hash and
+    metrics (epochs, accuracy, size). Identical configurations can be looked up
+    with `find` instead of retraining, identical files are stored once, and only
+    the `keep_per_model` most recent entries per model are retained.
+    """
+
+    def __init__(self, root="checkpoints/store", keep_per_model=5):
+        """
+        Args:
+            root: Directory holding the checkpoints and `index.json`.
+            keep_per_model: Number of entries kept per model; older ones are deleted.
+        """
+        self.root = root
+        self.keep_per_model = keep_per_model
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+
+    def _read(self):
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, entries):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def list_checkpoints(self, model_name=None):
+        """
+        Returns:
+            list: Index entries, newest first, optionally filtered by model.
+        """
+        entries = self._read()
+        if model_name is not None:
+            entries = [e for e in entries if e["model_name"] == model_name]
+        return sorted(entries, key=lambda e: e["created_at"], reverse=True)
+
+    def find(self, model_name, dataset, hparams):
+        """
+        Returns:
+            dict: The newest entry trained with this exact configuration, or None.
+        """
+        key = run_key(model_name, dataset, hparams)
+        matches = [e for e in self.list_checkpoints(model_name) if e["run_key"] == key]
+        return matches[0] if matches else None
+
+    def add(self, ckpt_path, model_name, dataset, hparams, metrics=None):
+        """
+        Move a freshly written checkpoint into the store and index it.
+
+        Args:
+            ckpt_path: Path of the checkpoint to store; the file is moved.
+            model_name: Name in the `ModelRegistry`.
+            dataset: Dataset the model was trained on.
+            hparams: Dict of hyperparameters.
+            metrics: Optional dict such as {"epochs": 3, "accuracy": 0.97}.
+
+        Returns:
+            dict: The index entry.
+        """
+        sha = file_sha256(ckpt_path)
+        model_dir = os.path.join(self.root, hashlib.sha1(model_name.encode("utf-8")).hexdigest()[:8])
+        stored_path = os.path.join(model_dir, f"{sha[:16]}.ckpt")
+
+        with self._lock:
+            entries = self._read()
+
+            existing = [e for e in entries if e["sha256"] == sha]
+            if existing:
+                os.remove(ckpt_path)
+                return existing[0]
+
+            os.makedirs(model_dir, exist_ok=True)
+            shutil.move(ckpt_path, stored_path)
+
+            entry = {
+                "id": sha[:16],
+                "model_name": model_name,
+                "dataset": dataset,
+                "hparams": hparams,
+                "run_key": run_key(model_name, dataset, hparams),
+                "sha256": sha,
+                "path": stored_path,
+                "size": os.path.getsize(stored_path),
+                "metrics": metrics or {},
+                "created_at": time.time(),
+            }
+            entries.append(entry)
+            self._write(self._evict(entries))
+
+        return entry
+
+    def remove(self, entry_id):
+        """
+        Delete an entry, its checkpoint file and the artifacts built from it.
+        """
+        with self._lock:
+            entries = self._read()
+            for entry in [e for e in entries if e["id"] == entry_id]:
+                remove_checkpoint_files(entry["path"])
+            self._write([e for e in entries if e["id"] != entry_id])
+
+    def _evict(self, entries):
+        kept = []
+        per_model = {}
+
+        for entry in sorted(entries, key=lambda e: e["created_at"], reverse=True):
+            count = per_model.get(entry["model_name"], 0)
+            if count < self.keep_per_model:
+                kept.append(entry)
+                per_model[entry["model_name"]] = count + 1
+            else:
+                remove_checkpoint_files(entry["path"])
+
+        return kept
@@ -0,0 +1,183 @@
+import os
+import json
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, DataLoader
+
+
+MANIFEST = "manifest.json"
+
+
+def materialize(dataset, cache_dir, mean, std, source=None, batch_size=512, num_workers=2):
+    """
+    Decode and transform `dataset` once and write it to disk as uint8 `.npy` arrays.
+
+    The dataset must yield normalised float tensors; the normalisation is undone
+    so the images can be stored losslessly as uint8 and re-applied per batch.
+    The manifest is written last, so an interrupted run is simply redone.
+
+    Args:
+        dataset: A torch dataset yielding (normalised image tensor, label).
+        cache_dir: Output directory.
+        mean: Per-channel mean used by the dataset's Normalize transform.
+        std: Per-channel std used by the dataset's Normalize transform.
+        source: Optional JSON-serialisable description of where the images came
+            from (dataset, split, transform), recorded in the manifest.
+        batch_size: Images decoded per step.
+        num_workers: DataLoader workers used for decoding.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    # A stale manifest must not describe the partly rewritten arrays
+    if os.path.exists(os.path.join(cache_dir, MANIFEST)):
+        os.remove(os.path.join(cache_dir, MANIFEST))
+
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers)
+    shape = tuple(dataset[0][0].shape)
+
+    images = np.lib.format.open_memmap(
+        os.path.join(cache_dir, "images.npy"), mode="w+", dtype=np.uint8, shape=(len(dataset), *shape)
+    )
+    labels = np.empty(len(dataset), dtype=np.int64)
+
+    mean_t = torch.tensor(mean).view(1, -1, 1, 1)
+    std_t = torch.tensor(std).view(1, -1, 1, 1)
+
+    start = 0
+    for x, y in loader:
+        pixels = ((x * std_t + mean_t) * 255).round_().clamp_(0, 255).to(torch.uint8)
+        images[start:start + len(x)] = pixels.numpy()
+        labels[start:start + len(x)] = y.numpy()
+        start += len(x)
+
+    images.flush()
+    del images
+    np.save(os.path.join(cache_dir, "labels.npy"), labels)
+
+    with open(os.path.join(cache_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({
+            "num_samples": len(dataset),
+            "shape": list(shape),
+            "dtype": "uint8",
+            "mean": list(mean),
+            "std": list(std),
+            "source": source,
+        }, f, indent=2)
+
+
+def read_manifest(cache_dir):
+    """
+    Returns:
+        dict: The manifest written by `materialize`, or None if the cache is incomplete.
+    """
+    path = os.path.join(cache_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class MemmapDigitDataset(Dataset):
+    """
+    Serves pre-decoded uint8 images from a memory-mapped `.npy` file.
+
+    Items are uint8 tensors viewing the mapped file; use `collate` as the
+    DataLoader `collate_fn` to normalise a whole batch in one operation.
+    The arrays are opened lazily in each process, so DataLoader workers
+    share the OS page cache instead of receiving pickled copies.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir: Directory written by `materialize`.
+        """
+        self.cache_dir = cache_dir
+
+        with open(os.path.join(cache_dir, MANIFEST), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        self.mean = torch.tensor(self.manifest["mean"]).view(1, -1, 1, 1) * 255
+        self.std = torch.tensor(self.manifest["std"]).view(1, -1, 1, 1) * 255
+        self._images = None
+        self._labels = None
+
+    def _open(self):
+        if self._images is None:
+            # Copy-on-write mapping: writable views without touching the file
+            self._images = np.load(os.path.join(self.cache_dir, "images.npy"), mmap_mode="c")
+            self._labels = np.load(os.path.join(self.cache_dir, "labels.npy"))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_images"] = None
+        state["_labels"] = None
+        return state
+
+    def __len__(self):
+        return self.manifest["num_samples"]
+
+    def __getitem__(self, index):
+        self._open()
+        return torch.from_numpy(self._images[index]), int(self._labels[index])
+
+    def __getitems__(self, indices):
+        # One gather from the mapped file per batch instead of one read per item
+        self._open()
+        order = np.sort(indices)
+        return torch.from_numpy(self._images[order]), torch.from_numpy(self._labels[order])
+
+    def collate(self, batch):
+        """
+        Normalise a batch returned by `__getitems__` (or a list of items) to float.
+        """
+        if isinstance(batch, tuple):
+            images, labels = batch
+        else:
+            images = torch.stack([image for image, _ in batch])
+            labels = torch.tensor([label for _, label in batch])
+
+        return images.float().sub_(self.mean).div_(self.std), labels
+
+
+def cached_digit_datasets(access, cache_dir, mean, std, source=None):
+    """
+    Train and test datasets served from the memmap cache, materialising it on first use.
+
+    Each split records its source dataset, split name and transform in the
+    manifest, and is rebuilt when any of them (or `mean`/`std`) no longer match,
+    so a cache directory is never served for different data.
+
+    Args:
+        access: A kale dataset access object with `get_train()` and `get_test()`.
+        cache_dir: Root directory for the cache; "train" and "test" are created inside.
+        mean: Per-channel mean of the access object's Normalize transform.
+        std: Per-channel std of the access object's Normalize transform.
+        source: Optional dict identifying the data, e.g. {"dataset": "MNIST_RGB"}.
+
+    Returns:
+        train_ds, test_ds
+    """
+    # kale access objects keep their torchvision transform in `_transform`
+    transform = getattr(access, "_transform", None)
+
+    datasets = []
+    for split, get_split in (("train", access.get_train), ("test", access.get_test)):
+        split_dir = os.path.join(cache_dir, split)
+        expected = {
+            **(source or {}),
+            "split": split,
+            "transform": None if transform is None else repr(transform),
+        }
+
+        manifest = read_manifest(split_dir)
+        if (
+            manifest is None
+            or manifest.get("source") != expected
+            or manifest["mean"] != list(mean)
+            or manifest["std"] != list(std)
+        ):
+            materialize(get_split(), split_dir, mean, std, source=expected)
+        datasets.append(MemmapDigitDataset(split_dir))
+
+    return tuple(datasets)
@@ -0,0 +1,286 @@
+import os
+import uuid
+import time
+import queue
+import signal
+import threading
+import multiprocessing as mp
+from collections import OrderedDict, deque
+
+from ml_core.loader_config import LoaderConfig
+
+
+class TrainingJob:
+    """
+    State of one background training run as seen by the web app.
+    `state` is one of "queued", "running", "finished", "failed" or "cancelled".
+    """
+
+    def __init__(
+        self, job_id, model_name, dataset, epochs, ckpt_path, loader_config=None, num_processes=1, train_options=None
+    ):
+        self.id = job_id
+        self.model_name = model_name
+        self.dataset = dataset
+        self.epochs = epochs
+        self.loader_config = loader_config or LoaderConfig()
+        self.num_processes = num_processes
+        self.train_options = train_options or {}
+        self.ckpt_path = ckpt_path
+        self.state = "queued"
+        self.progress = []
+        self.metrics = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.process = None
+        self.events = None
+
+    @property
+    def latest(self):
+        """The most recent progress report, or None before the first epoch ends."""
+        return self.progress[-1] if self.progress else None
+
+    @property
+    def hparams(self):
+        return {
+            "epochs": self.epochs,
+            "batch_size": self.loader_config.batch_size,
+            "num_processes": self.num_processes,
+            **self.train_options,
+        }
+
+    @property
+    def done(self):
+        return self.state in ("finished", "failed", "cancelled")
+
+
+class _EventReporter:
+    """
+    Picklable progress reporter, so it survives being sent to spawned DDP ranks.
+    """
+
+    def __init__(self, job_id, events):
+        self.job_id = job_id
+        self.events = events
+
+    def __call__(self, metrics):
+        self.events.put((self.job_id, "progress", metrics))
+
+
+def _terminate_group(process):
+    """
+    Terminate `process` and every process in its group, falling back to the
+    process alone before it has made itself a group leader (or on Windows).
+    """
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.terminate()
+
+
+def _run_job(
+    job_id, model_name, dataset, epochs, ckpt_path, loader_config, num_processes, train_options, num_threads, events
+):
+    """
+    Entry point of the training process. Reports progress and the outcome on `events`.
+    """
+    # Lead a new process group, so cancelling also stops the DDP ranks this process spawns
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+
+    import torch
+    import ml_core  # noqa: F401  (registers the bundled models)
+    from ml_core.train import train_model, ProgressCallback
+
+    torch.set_num_threads(num_threads)
+
+    try:
+        _, metrics = train_model(
+            model_name,
+            epochs,
+            ckpt_path=ckpt_path,
+            loader_config=loader_config,
+            dataset=dataset,
+            num_processes=num_processes,
+            num_threads=num_threads,
+            callbacks=[ProgressCallback(_EventReporter(job_id, events))],
+            **train_options,
+        )
+    except Exception as e:
+        events.put((job_id, "failed", repr(e)))
+    else:
+        events.put((job_id, "finished", metrics))
+
+
+class JobManager:
+    """
+    Runs training jobs in separate processes so the Streamlit script never blocks.
+
+    At most `max_concurrent` jobs run at once; later submissions wait in a FIFO
+    queue. Each running job gets an equal share of the CPU threads, so
+    concurrent users do not oversubscribe the machine. Finished checkpoints
+    are moved into the `CheckpointStore`, if one is given. Failed or cancelled
+    jobs can be resumed from their last completed epoch.
+
+    Each job process reports on its own queue and leads its own process group,
+    so cancelling a job kills its DDP ranks too, and a queue left mid-write by
+    the kill is simply discarded.
+    """
+
+    def __init__(self, max_concurrent=1, ckpt_dir="checkpoints/jobs", store=None):
+        """
+        Args:
+            max_concurrent: Maximum number of training processes.
+            ckpt_dir: Directory where each job writes its checkpoint.
+            store: Optional `CheckpointStore` receiving finished checkpoints.
+        """
+        self.max_concurrent = max_concurrent
+        self.ckpt_dir = ckpt_dir
+        self.store = store
+        self.num_threads = max(1, (os.cpu_count() or 1) // max_concurrent)
+
+        self._ctx = mp.get_context("spawn")
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+        os.makedirs(ckpt_dir, exist_ok=True)
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def submit(self, model_name, epochs, dataset=None, loader_config=None, num_processes=1, train_options=None):
+        """
+        Queue a training job.
+
+        Args:
+            model_name: Name in the `ModelRegistry`.
+            epochs: Number of training epochs.
+            dataset: Dataset to train on, recorded with the checkpoint; None means the model's default.
+            loader_config: Optional `LoaderConfig` for the job's dataloaders.
+            num_processes: CPU data-parallel processes, see `train_model`.
+            train_options: Optional dict of extra `train_model` arguments, e.g.
+                {"patience": 2, "precision": "bf16", "accumulate_grad_batches": 2}.
+
+        Returns:
+            str: The job ID.
+        """
+        job_id = uuid.uuid4().hex[:8]
+        ckpt_path = os.path.join(self.ckpt_dir, f"{job_id}.ckpt")
+        job = TrainingJob(
+            job_id, model_name, dataset, epochs, ckpt_path, loader_config, num_processes, train_options
+        )
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._pending.append(job_id)
+            self._start_pending()
+
+        return job_id
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """Returns all jobs, most recent first."""
+        return list(reversed(self._jobs.values()))
+
+    def queue_position(self, job_id):
+        """
+        Returns:
+            int: 1-based position in the waiting queue, or None if not queued.
+        """
+        with self._lock:
+            if job_id in self._pending:
+                return self._pending.index(job_id) + 1
+        return None
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job or terminate a running one.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.done:
+                return
+
+            if job_id in self._pending:
+                self._pending.remove(job_id)
+            elif job.process is not None:
+                _terminate_group(job.process)
+                job.events = None
+
+            job.state = "cancelled"
+            self._start_pending()
+
+    def resume(self, job_id):
+        """
+        Re-queue a failed or cancelled job; it continues from its last completed epoch.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.state not in ("failed", "cancelled"):
+                return
+
+            job.state = "queued"
+            job.error = None
+            self._pending.append(job_id)
+            self._start_pending()
+
+    def _start_pending(self):
+        running = sum(1 for job in self._jobs.values() if job.state == "running")
+
+        while self._pending and running < self.max_concurrent:
+            job = self._jobs[self._pending.popleft()]
+            job.events = self._ctx.Queue()
+            job.process = self._ctx.Process(
+                target=_run_job,
+                args=(
+                    job.id, job.model_name, job.dataset, job.epochs, job.ckpt_path,
+                    job.loader_config, job.num_processes, job.train_options, self.num_threads, job.events,
+                ),
+            )
+            job.process.start()
+            job.state = "running"
+            running += 1
+
+    def _handle_event(self, job, kind, payload):
+        if kind == "progress":
+            job.progress.append(payload)
+        elif kind == "finished":
+            job.metrics = payload
+            job.state = "finished"
+            if self.store is not None:
+                try:
+                    entry = self.store.add(job.ckpt_path, job.model_name, job.dataset, job.hparams, payload)
+                    job.ckpt_path = entry["path"]
+                except OSError as e:
+                    job.state = "failed"
+                    job.error = f"Could not store checkpoint: {e}"
+        elif kind == "failed":
+            job.state = "failed"
+            job.error = payload
+
+    def _monitor(self):
+        while True:
+            received = False
+
+            with self._lock:
+                for job in list(self._jobs.values()):
+                    if job.state != "running":
+                        continue
+
+                    try:
+                        _, kind, payload = job.events.get_nowait()
+                    except queue.Empty:
+                        # Processes that died without reporting (killed, out of memory)
+                        if not job.process.is_alive() and job.events.empty():
+                            job.state = "failed"
+                            job.error = f"Training process exited with code {job.process.exitcode}"
+                        continue
+
+                    received = True
+                    self._handle_event(job, kind, payload)
+
+                self._start_pending()
+
+            if not received:
+                time.sleep(0.5)
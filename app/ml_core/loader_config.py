@@ -0,0 +1,100 @@
+import os
+
+import torch
+
+
+class LoaderConfig:
+    """
+    DataLoader settings passed from `train_model` to a model's `get_dataloader`,
+    so data ingestion can be tuned per deployment without editing model classes.
+    """
+
+    PROFILES = ["default", "auto"]
+
+    def __init__(
+        self,
+        batch_size=32,
+        num_workers=2,
+        prefetch_factor=None,
+        persistent_workers=False,
+        pin_memory=True,
+    ):
+        """
+        Args:
+            batch_size: Samples per batch.
+            num_workers: DataLoader worker processes (0 loads in the main process).
+            prefetch_factor: Batches prefetched per worker; None uses the torch default.
+            persistent_workers: Keep workers alive between epochs.
+            pin_memory: Copy batches into pinned memory for faster GPU transfer.
+        """
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.prefetch_factor = prefetch_factor
+        self.persistent_workers = persistent_workers
+        self.pin_memory = pin_memory
+
+    @classmethod
+    def auto(cls, batch_size=32, processes=1):
+        """
+        Picks settings for the current machine: one worker per spare core (up to 8),
+        persistent workers with deeper prefetching, and pinning only when CUDA is present.
+        With several training processes the cores are shared between them.
+        """
+        num_workers = min(8, max(0, (os.cpu_count() or 1) // processes - 1))
+        return cls(
+            batch_size=batch_size,
+            num_workers=num_workers,
+            prefetch_factor=4 if num_workers > 0 else None,
+            persistent_workers=num_workers > 0,
+            pin_memory=torch.cuda.is_available(),
+        )
+
+    @classmethod
+    def from_profile(cls, profile="default", processes=1, **overrides):
+        """
+        Build a config from a named profile, then apply `overrides`.
+
+        Args:
+            profile: One of `PROFILES`.
+            processes: Number of training processes sharing the machine.
+            **overrides: Any constructor argument, e.g. batch_size=64.
+        """
+        if profile == "auto":
+            config = cls.auto(processes=processes)
+        elif profile == "default":
+            config = cls()
+        else:
+            raise ValueError(f"Unknown loader profile '{profile}', expected one of {cls.PROFILES}")
+
+        for key, value in overrides.items():
+            if not hasattr(config, key):
+                raise TypeError(f"Unknown loader setting '{key}'")
+            setattr(config, key, value)
+
+        return config
+
+    def dataloader_kwargs(self, shuffle=False):
+        """
+        Keyword arguments for `torch.utils.data.DataLoader`.
+        Worker-only options are left out when loading in the main process.
+        """
+        kwargs = {
+            "batch_size": self.batch_size,
+            "shuffle": shuffle,
+            "num_workers": self.num_workers,
+            "pin_memory": self.pin_memory,
+        }
+
+        if self.num_workers > 0:
+            kwargs["persistent_workers"] = self.persistent_workers
+            if self.prefetch_factor is not None:
+                kwargs["prefetch_factor"] = self.prefetch_factor
+
+        return kwargs
+
+    def __repr__(self):
+        return (
+            f"LoaderConfig(batch_size={self.batch_size}, num_workers={self.num_workers}, "
+            f"prefetch_factor={self.prefetch_factor}, persistent_workers={self.persistent_workers}, "
+            f"pin_memory={self.pin_memory})"
+        )
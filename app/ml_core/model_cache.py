@@ -0,0 +1,158 @@
+import io
+import os
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+
+import torch
+
+
+def checkpoint_key(ckpt):
+    """
+    Content hash of a checkpoint given as a path, raw bytes or an uploaded file.
+
+    Args:
+        ckpt: Path to a .ckpt file, bytes, or a file-like object with `getvalue()`.
+
+    Returns:
+        str: SHA-256 hex digest of the checkpoint bytes.
+    """
+    if isinstance(ckpt, (str, os.PathLike)):
+        return _file_digest(os.fspath(ckpt), *_stat_key(ckpt))
+
+    data = ckpt if isinstance(ckpt, bytes) else ckpt.getvalue()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@functools.lru_cache(maxsize=256)
+def _file_digest(path, mtime_ns, size):
+    # Paths are re-hashed only when the file changes on disk; old versions age out of the LRU
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def model_nbytes(model):
+    """
+    Memory held by a module's parameters and buffers, in bytes.
+    """
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelCache:
+    """
+    Keeps loaded models in memory, keyed by model name and checkpoint content hash.
+    Least recently used models are evicted once their combined size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Memory budget for cached parameters and buffers.
+        """
+        self.max_bytes = max_bytes
+        self._models = OrderedDict()
+        # (model name, checkpoint path, variant) -> key, to serve models whose file was deleted
+        self._paths = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, model_cls, ckpt, variant=None, **kwargs):
+        """
+        Return the model for `ckpt`, loading and warming it up on a miss.
+
+        Args:
+            model_cls: A registered `BaseModel` subclass.
+            ckpt: Checkpoint path, bytes, uploaded file, or an already loaded module.
+            variant: Optional quantisation mode; loads the TorchScript artifact
+                that `ml_core.optimize` stored next to the checkpoint path. The
+                artifact's modification time is part of the key, so a rebuilt
+                artifact is reloaded, and its file size is what counts against
+                `max_bytes`, since packed quantised weights are not parameters.
+            **kwargs: Passed on to `model_cls.load`.
+
+        Returns:
+            torch.nn.Module: The model in eval mode.
+
+        Raises:
+            FileNotFoundError: If the checkpoint path no longer exists (e.g. it was
+                evicted from the `CheckpointStore`) and its model is not cached.
+        """
+        if isinstance(ckpt, torch.nn.Module):
+            return ckpt.eval()
+
+        path_key = None
+        if isinstance(ckpt, (str, os.PathLike)):
+            path_key = (model_cls.name, os.fspath(ckpt), variant)
+            if not os.path.exists(ckpt):
+                with self._lock:
+                    key = self._paths.get(path_key)
+                    if key in self._models:
+                        self._models.move_to_end(key)
+                        return self._models[key][0]
+                raise FileNotFoundError(f"Checkpoint {ckpt} no longer exists")
+
+        if variant is not None:
+            from ml_core.optimize import artifact_path, load_optimized
+            artifact_mtime_ns, artifact_size = _stat_key(artifact_path(ckpt, variant))
+            key = (model_cls.name, checkpoint_key(ckpt), variant, artifact_mtime_ns)
+        else:
+            key = (model_cls.name, checkpoint_key(ckpt), variant)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+
+        if variant is not None:
+            model = load_optimized(ckpt, variant)
+        else:
+            source = ckpt
+            if not isinstance(ckpt, (str, os.PathLike)):
+                source = io.BytesIO(ckpt if isinstance(ckpt, bytes) else ckpt.getvalue())
+
+            model = model_cls.load(source, **kwargs).eval()
+
+        example = model_cls.example_input()
+        if example is not None:
+            with torch.inference_mode():
+                model(example)
+
+        nbytes = artifact_size if variant is not None else model_nbytes(model)
+
+        with self._lock:
+            if key not in self._models:
+                # Drop models loaded from an earlier build of the same artifact
+                for stale in [k for k in self._models if k[:3] == key[:3]]:
+                    self._bytes -= self._models.pop(stale)[1]
+
+                self._models[key] = (model, nbytes)
+                self._bytes += nbytes
+            if path_key is not None:
+                self._paths[path_key] = key
+
+            while self._bytes > self.max_bytes and len(self._models) > 1:
+                _, (_, evicted) = self._models.popitem(last=False)
+                self._bytes -= evicted
+
+            self._paths = {path: k for path, k in self._paths.items() if k in self._models}
+
+            return self._models[key][0]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._paths.clear()
+            self._bytes = 0
+
+
+MODEL_CACHE = ModelCache()
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import torch
+
 
 class BaseModel(ABC):
     name = "base"
@@ -30,17 +32,58 @@ class BaseModel(ABC):
 
     @classmethod
     @abstractmethod
-    def get_dataloader(cls):
+    def get_dataloader(cls, loader_config=None, dataset=None):
         """
-        Returns a torch dataloader.
+        Returns train and test torch dataloaders.
+        `loader_config` is an optional `LoaderConfig`; None means the model's defaults.
+        `dataset` is one of `supported_datasets()`; None means the first one.
         """
         raise NotImplementedError
 
     @classmethod
     @abstractmethod
-    def render_ui(cls, ckpt):
+    def render_ui(cls, ckpt, variant=None):
         """
         Renders the UI component for the trainer.
+        `variant` selects an optimised artifact (see `ml_core.optimize`) instead of the checkpoint.
         """
         raise NotImplementedError
 
+    @classmethod
+    def example_input(cls):
+        """
+        Returns a sample input batch used to warm up a loaded model,
+        or None to skip warm-up.
+        """
+        return None
+
+    @classmethod
+    def inference_network(cls, model):
+        """
+        Returns the plain `nn.Module` used for inference, stripped of training-only
+        wrappers so it can be quantised and traced. Defaults to the model itself.
+        """
+        return model
+
+    @classmethod
+    def preprocess(cls, image):
+        """
+        Converts a PIL image into a single model input tensor (without batch dimension).
+        The default passes the image through unchanged, for models that take images directly.
+        """
+        return image
+
+    @classmethod
+    def predict_batch(cls, model, inputs):
+        """
+        Runs one forward pass over a list of preprocessed inputs.
+
+        Args:
+            model: A loaded model, e.g. from `load`.
+            inputs: A list of tensors returned by `preprocess`.
+
+        Returns:
+            list: One predicted class index per input.
+        """
+        with torch.inference_mode():
+            return model(torch.stack(inputs)).argmax(1).tolist()
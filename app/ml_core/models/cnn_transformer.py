@@ -1,3 +1,4 @@
+import torch
 import streamlit as st
 from PIL import Image
 from streamlit_drawable_canvas import st_canvas
@@ -11,6 +12,9 @@ from kale.pipeline.base_nn_trainer import CNNTransformerTrainer
 
 from ml_core.models.base_model import BaseModel
 from ml_core.registry import ModelRegistry
+from ml_core.model_cache import MODEL_CACHE
+from ml_core.data_cache import cached_digit_datasets
+from ml_core.loader_config import LoaderConfig
 
 
 @ModelRegistry.register
@@ -50,31 +54,51 @@ class CNNTransformerModel(BaseModel):
         return model
 
     @classmethod
-    def get_dataloader(cls):
-        access, _ = DigitDataset.get_access(DigitDataset.MNIST_RGB, "data/digits", num_channels=3)
+    def example_input(cls):
+        return torch.zeros(1, 3, 32, 32)
 
-        train_ds = access.get_train()
-        test_ds  = access.get_test()
+    @classmethod
+    def inference_network(cls, model):
+        return torch.nn.Sequential(model.feat, model.classifier)
+
+    @classmethod
+    def preprocess(cls, image):
+        return get_transform("mnist32rgb", augment=False)(image.convert("RGB"))
+
+    @classmethod
+    def get_dataloader(cls, loader_config=None, dataset=None):
+        # Images are decoded and transformed once into a uint8 memmap cache,
+        # then normalised per batch by the dataset's collate function.
+        dataset = dataset or cls.supported_datasets()[0]
+        if dataset not in cls.supported_datasets():
+            raise ValueError(f"Unsupported dataset '{dataset}', expected one of {cls.supported_datasets()}")
+
+        access, _ = DigitDataset.get_access(DigitDataset[dataset], "data/digits", num_channels=3)
+        train_ds, test_ds = cached_digit_datasets(
+            access,
+            f"data/digits/cache/{dataset.lower()}",
+            mean=(0.5, 0.5, 0.5),
+            std=(0.5, 0.5, 0.5),
+            source={"dataset": dataset, "num_channels": 3},
+        )
+
+        loader_config = loader_config or LoaderConfig()
 
         train_loader = DataLoader(
             train_ds,
-            batch_size=32,
-            shuffle=True,
-            num_workers=2,
-            pin_memory=True,
+            collate_fn=train_ds.collate,
+            **loader_config.dataloader_kwargs(shuffle=True),
         )
 
         test_loader = DataLoader(
             test_ds,
-            batch_size=32,
-            shuffle=False,
-            num_workers=2,
-            pin_memory=True,
+            collate_fn=test_ds.collate,
+            **loader_config.dataloader_kwargs(shuffle=False),
         )
         return train_loader, test_loader
     
     @classmethod
-    def render_ui(cls, ckpt):
+    def render_ui(cls, ckpt, variant=None):
         col_left, col_center, col_right = st.columns([2,4,1])
         with col_center:
             st.subheader("Draw a digit (0 to 9)")
@@ -92,10 +116,9 @@ class CNNTransformerModel(BaseModel):
                 img_arr = canvas.image_data
 
                 pil = Image.fromarray(img_arr.astype("uint8"))
-                tf  = get_transform("mnist32rgb", augment=False)
-                x   = tf(pil).unsqueeze(0)
-                net  = cls.load(ckpt)
-                pred = net(x).argmax(1).item()
+                x   = cls.preprocess(pil)
+                net  = MODEL_CACHE.get(cls, ckpt, variant=variant)
+                pred = cls.predict_batch(net, [x])[0]
                 
                 st.image(pil.resize((112, 112)))
                 st.write(f"Prediction: **{pred}**")
@@ -0,0 +1,213 @@
+"""
+Post-training optimisation of stored checkpoints for CPU inference.
+
+Builds an int8 version of a model (dynamic quantisation of Linear layers, or
+FX-mode static quantisation calibrated on training batches), traces it with
+TorchScript and optionally exports the fp32 network to ONNX. Artifacts and a
+JSON report are written next to the checkpoint and reused while the checkpoint
+is unchanged. An int8 model that loses more than `max_accuracy_drop` accuracy
+is rejected: only its report is written, not the artifact.
+
+Usage (from the app directory):
+    python -m ml_core.optimize --model "CNN Transformer" --ckpt path/to/model.ckpt --mode static --onnx
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+import itertools
+
+import torch
+from torch.ao.quantization import quantize_dynamic, get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+from ml_core.model_cache import checkpoint_key
+from ml_core.train import evaluate_accuracy
+
+
+MODES = ["dynamic", "static"]
+MAX_ACCURACY_DROP = 0.01
+
+
+def artifact_path(ckpt_path, mode, suffix=".pt"):
+    """
+    Path of an optimised artifact stored next to `ckpt_path`.
+    """
+    stem, _ = os.path.splitext(ckpt_path)
+    return f"{stem}.{mode}{suffix}"
+
+
+def quantize(net, mode, example, calibration_batches=()):
+    """
+    Quantise an fp32 network to int8.
+
+    Args:
+        net: fp32 network in eval mode.
+        mode: "dynamic" quantises Linear layers only; "static" quantises every
+            supported layer with activation ranges calibrated on `calibration_batches`.
+        example: Example input batch used for FX tracing.
+        calibration_batches: Iterable of input batches for static calibration.
+
+    Returns:
+        torch.nn.Module: The quantised network.
+    """
+    if mode == "dynamic":
+        return quantize_dynamic(net, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if mode == "static":
+        prepared = prepare_fx(net, get_default_qconfig_mapping("x86"), example_inputs=(example,))
+        with torch.inference_mode():
+            for batch in calibration_batches:
+                prepared(batch)
+        return convert_fx(prepared)
+
+    raise ValueError(f"Unknown quantisation mode '{mode}', expected one of {MODES}")
+
+
+def serialized_size(module):
+    buffer = io.BytesIO()
+    torch.jit.save(module, buffer)
+    return buffer.tell()
+
+
+def latency_ms(module, example, runs=50):
+    """
+    Mean latency of one forward pass over `example`, after a short warm-up.
+    """
+    with torch.inference_mode():
+        for _ in range(5):
+            module(example)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            module(example)
+
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def optimize_checkpoint(
+    Model,
+    ckpt_path,
+    mode="dynamic",
+    export_onnx=False,
+    calibration_steps=32,
+    force=False,
+    max_accuracy_drop=MAX_ACCURACY_DROP,
+):
+    """
+    Quantise, trace and (optionally) export a checkpoint, checking the accuracy cost.
+
+    Args:
+        Model: A registered `BaseModel` subclass.
+        ckpt_path: Path of the checkpoint to optimise.
+        mode: One of `MODES`.
+        export_onnx: Also export the fp32 network to ONNX (needs `onnx` and `onnxscript`).
+        calibration_steps: Training batches used to calibrate static quantisation.
+        force: Rebuild even if a report for this checkpoint already exists.
+        max_accuracy_drop: Largest tolerated fall in test accuracy, e.g. 0.01 for one
+            percentage point. Beyond it the report is marked "rejected" and no int8
+            artifact is saved (an earlier one is deleted); None accepts any drop.
+
+    Returns:
+        dict: Report with fp32/int8 accuracy and the delta, batch-1 latency,
+        serialized size, whether the int8 model was rejected, and artifact paths.
+    """
+    report_path = artifact_path(ckpt_path, mode, ".json")
+    sha = checkpoint_key(ckpt_path)
+
+    if not force and os.path.exists(report_path):
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        if (
+            report["checkpoint_sha256"] == sha
+            and report.get("max_accuracy_drop") == max_accuracy_drop
+            and (report["onnx_path"] or not export_onnx)
+        ):
+            return report
+
+    net = Model.inference_network(Model.load(ckpt_path)).eval()
+    example = Model.example_input()
+    train_loader, test_loader = Model.get_dataloader()
+
+    calibration = (x for x, _ in itertools.islice(train_loader, calibration_steps))
+    quantized = quantize(net, mode, example, calibration)
+
+    with torch.inference_mode():
+        fp32_script = torch.jit.freeze(torch.jit.trace(net, example))
+        int8_script = torch.jit.freeze(torch.jit.trace(quantized, example))
+
+    onnx_path = None
+    if export_onnx:
+        onnx_path = artifact_path(ckpt_path, "fp32", ".onnx")
+        torch.onnx.export(
+            net, example, onnx_path,
+            input_names=["input"], output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        )
+
+    fp32_accuracy = evaluate_accuracy(net, test_loader)
+    int8_accuracy = evaluate_accuracy(int8_script, test_loader)
+    rejected = max_accuracy_drop is not None and fp32_accuracy - int8_accuracy > max_accuracy_drop
+
+    script_path = artifact_path(ckpt_path, mode)
+    if rejected:
+        # Never leave an artifact from an earlier build that predictions could still pick up
+        if os.path.exists(script_path):
+            os.remove(script_path)
+        script_path = None
+    else:
+        torch.jit.save(int8_script, script_path)
+
+    report = {
+        "model_name": Model.name,
+        "mode": mode,
+        "checkpoint_sha256": sha,
+        "fp32_accuracy": fp32_accuracy,
+        "int8_accuracy": int8_accuracy,
+        "accuracy_delta": int8_accuracy - fp32_accuracy,
+        "max_accuracy_drop": max_accuracy_drop,
+        "rejected": rejected,
+        "fp32_latency_ms": latency_ms(fp32_script, example),
+        "int8_latency_ms": latency_ms(int8_script, example),
+        "fp32_size_bytes": serialized_size(fp32_script),
+        "int8_size_bytes": serialized_size(int8_script),
+        "script_path": script_path,
+        "onnx_path": onnx_path,
+    }
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    return report
+
+
+def load_optimized(ckpt_path, mode):
+    """
+    Load the TorchScript int8 artifact built by `optimize_checkpoint`.
+    """
+    return torch.jit.load(artifact_path(ckpt_path, mode), map_location="cpu").eval()
+
+
+if __name__ == "__main__":
+    import ml_core  # noqa: F401
+    from ml_core.registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description="Quantise and export a checkpoint for CPU inference.")
+    parser.add_argument("--model", required=True, choices=ModelRegistry.list_models())
+    parser.add_argument("--ckpt", required=True)
+    parser.add_argument("--mode", choices=MODES, default="dynamic")
+    parser.add_argument("--onnx", action="store_true", help="Also export the fp32 network to ONNX.")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument(
+        "--max-accuracy-drop", type=float, default=MAX_ACCURACY_DROP,
+        help="Largest tolerated accuracy loss; a worse int8 model is not saved.",
+    )
+    args = parser.parse_args()
+
+    report = optimize_checkpoint(
+        ModelRegistry.get(args.model), args.ckpt, args.mode,
+        export_onnx=args.onnx, force=args.force, max_accuracy_drop=args.max_accuracy_drop,
+    )
+    print(json.dumps(report, indent=2))
@@ -15,3 +15,22 @@ class ModelRegistry:
     @classmethod
     def get(cls, name):
         return cls.models[name]
+
+    @classmethod
+    def predict_batch(cls, name, ckpt, inputs):
+        """
+        Runs a batch of preprocessed inputs through the cached model for `ckpt`.
+
+        Args:
+            name: Registered model name.
+            ckpt: Checkpoint accepted by `ModelCache.get`.
+            inputs: A list of tensors returned by the model's `preprocess`.
+
+        Returns:
+            list: One prediction per input.
+        """
+        from ml_core.model_cache import MODEL_CACHE
+
+        Model = cls.get(name)
+        model = MODEL_CACHE.get(Model, ckpt)
+        return Model.predict_batch(model, inputs)
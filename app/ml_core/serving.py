@@ -0,0 +1,199 @@
+"""
+Local inference server for registered models.
+
+Requests are collected by a dynamic batcher for up to `max_wait_ms` or
+`max_batch_size` items and answered with a single forward pass.
+
+Usage (from the app directory):
+    python -m ml_core.serving --model "CNN Transformer" --ckpt model.ckpt --port 8600
+
+    POST /predict   {"image": "<base64 PNG/JPEG>"}  ->  {"prediction": 7}
+    GET  /metrics   Prometheus text (latency, batch size, request counters)
+"""
+
+import io
+import json
+import time
+import queue
+import base64
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+import ml_core  # noqa: F401  (registers the bundled models)
+from ml_core.registry import ModelRegistry
+from utils.metrics import Metrics
+
+
+class DynamicBatcher:
+    """
+    Groups individual requests into batches on a single worker thread.
+    A batch is closed when it reaches `max_batch_size` items or when the
+    oldest item has waited `max_wait_ms`.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5, metrics=None):
+        """
+        Args:
+            predict_fn: Callable taking a list of inputs and returning a list of outputs.
+            max_batch_size: Largest batch passed to `predict_fn`.
+            max_wait_ms: Longest time a request waits for others to join its batch.
+            metrics: Optional `Metrics` registry for batch statistics.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics or Metrics()
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """
+        Queue one input.
+
+        Returns:
+            Future: Resolves to the output for `item`.
+        """
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._queue.put(None)
+                    break
+                batch.append(entry)
+
+            inputs = [item for item, _ in batch]
+            try:
+                with self.metrics.span("serving.forward"):
+                    outputs = self.predict_fn(inputs)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.metrics.observe("serving.batch_size", len(batch))
+            self.metrics.increment("serving.batches")
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+
+def make_server(model_name, ckpt, host="127.0.0.1", port=8600, max_batch_size=32, max_wait_ms=5):
+    """
+    Builds an HTTP server that serves predictions for one registered model.
+
+    Args:
+        model_name: Name in the `ModelRegistry`.
+        ckpt: Checkpoint path accepted by `ModelCache.get`.
+        host: Interface to bind.
+        port: TCP port to listen on.
+        max_batch_size: Largest batch per forward pass.
+        max_wait_ms: Longest time a request waits for a batch to fill.
+
+    Returns:
+        ThreadingHTTPServer: Call `serve_forever()` to start it.
+    """
+    Model = ModelRegistry.get(model_name)
+    metrics = Metrics()
+    batcher = DynamicBatcher(
+        lambda inputs: ModelRegistry.predict_batch(model_name, ckpt, inputs),
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        metrics=metrics,
+    )
+
+    # Load and warm up the model before accepting traffic, for models that provide a sample input
+    example = Model.example_input()
+    if example is not None:
+        ModelRegistry.predict_batch(model_name, ckpt, [example[0]])
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body, content_type="application/json"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._reply(200, metrics.to_prometheus(), "text/plain; version=0.0.4")
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self.send_error(404)
+                return
+
+            start = time.perf_counter()
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                image = Image.open(io.BytesIO(base64.b64decode(payload["image"])))
+                x = Model.preprocess(image)
+            except Exception as e:
+                metrics.increment("serving.bad_requests")
+                self._reply(400, json.dumps({"error": str(e)}))
+                return
+
+            try:
+                prediction = batcher.submit(x).result()
+            except Exception as e:
+                metrics.increment("serving.errors")
+                self._reply(500, json.dumps({"error": str(e)}))
+                return
+
+            metrics.increment("serving.requests")
+            metrics.observe("serving.latency", (time.perf_counter() - start) * 1000)
+            self._reply(200, json.dumps({"prediction": prediction}))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.batcher = batcher
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a registered model over HTTP.")
+    parser.add_argument("--model", required=True, choices=ModelRegistry.list_models())
+    parser.add_argument("--ckpt", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    server = make_server(
+        args.model, args.ckpt, args.host, args.port, args.max_batch_size, args.max_wait_ms
+    )
+    print(f"Serving {args.model} on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -1,23 +1,229 @@
+import os
+import time
+
 import torch
 import pytorch_lightning as pl
+from pytorch_lightning.strategies import DDPStrategy
+from pytorch_lightning.callbacks import EarlyStopping, ModelCheckpoint
 from ml_core.registry import ModelRegistry
 
-def train_model(model_name, num_epochs=3):
+
+PRECISIONS = {"fp32": "32-true", "bf16": "bf16-mixed"}
+
+
+class ProgressCallback(pl.Callback):
+    """
+    Reports epoch, training and validation loss and throughput after every training epoch.
+    Under data-parallel training only rank 0 reports, with throughput summed over ranks.
+    """
+
+    def __init__(self, report):
+        """
+        Args:
+            report: Picklable callable receiving a dict with "epoch", "loss",
+                "val_loss" and "samples_per_sec".
+        """
+        self.report = report
+        self._samples = 0
+        self._start = None
+
+    def on_train_epoch_start(self, trainer, pl_module):
+        self._samples = 0
+        self._start = time.perf_counter()
+
+    def on_train_batch_end(self, trainer, pl_module, outputs, batch, batch_idx):
+        self._samples += len(batch[0])
+
+    def on_train_epoch_end(self, trainer, pl_module):
+        if not trainer.is_global_zero:
+            return
+
+        elapsed = time.perf_counter() - self._start
+        losses = [v for k, v in trainer.callback_metrics.items() if "loss" in k and not k.startswith("valid")]
+        val_loss = trainer.callback_metrics.get("valid_loss")
+        samples = self._samples * trainer.world_size
+
+        self.report({
+            "epoch": trainer.current_epoch + 1,
+            "max_epochs": trainer.max_epochs,
+            "loss": float(losses[0]) if losses else None,
+            "val_loss": float(val_loss) if val_loss is not None else None,
+            "samples_per_sec": samples / elapsed if elapsed > 0 else 0.0,
+        })
+
+
+class ThreadsPerProcess(pl.Callback):
+    """
+    Sets the torch intra-op thread count inside every training process.
+    """
+
+    def __init__(self, num_threads):
+        self.num_threads = num_threads
+
+    def setup(self, trainer, pl_module, stage):
+        torch.set_num_threads(self.num_threads)
+
+
+class SaveFinalCheckpoint(pl.Callback):
+    """
+    Writes the checkpoint at the end of training from inside the training processes,
+    so it also works when ranks run in spawned processes.
+    """
+
+    def __init__(self, ckpt_path):
+        self.ckpt_path = ckpt_path
+
+    def on_train_end(self, trainer, pl_module):
+        trainer.save_checkpoint(self.ckpt_path)
+
+
+def resume_path(ckpt_path):
+    """
+    Path of the rolling end-of-epoch checkpoint that an interrupted run resumes from.
+    """
+    stem, _ = os.path.splitext(ckpt_path)
+    return f"{stem}.last.ckpt"
+
+
+def evaluate_accuracy(model, loader):
+    """
+    Top-1 accuracy of `model` on `loader`.
+    """
+    model.eval()
+    correct, total = 0, 0
+
+    with torch.inference_mode():
+        for x, y in loader:
+            correct += (model(x).argmax(1) == y).sum().item()
+            total += len(y)
+
+    return correct / total if total else 0.0
+
+
+def train_model(
+    model_name,
+    num_epochs=3,
+    ckpt_path="model.ckpt",
+    callbacks=None,
+    loader_config=None,
+    dataset=None,
+    num_processes=1,
+    num_threads=None,
+    patience=None,
+    precision="fp32",
+    accumulate_grad_batches=1,
+):
     """
     Simple training loop using pytorch lightning.
+
+    The test loader is used for validation after every epoch, and training stops
+    early once the validation loss has not improved for `patience` epochs. The
+    latest epoch is also checkpointed next to `ckpt_path`, so re-running an
+    interrupted job with the same `ckpt_path` resumes where it stopped.
+
+    With `num_processes > 1` the model is trained data-parallel on the CPU:
+    DDP over the gloo backend across that many spawned local processes, each
+    with an equal share of `num_threads` and its own shard of the training set.
+
+    Args:
+        model_name: Name in the `ModelRegistry`.
+        num_epochs: Number of training epochs.
+        ckpt_path: Where the final checkpoint is written.
+        callbacks: Optional extra Lightning callbacks, e.g. `ProgressCallback`.
+        loader_config: Optional `LoaderConfig` passed to the model's `get_dataloader`.
+        dataset: One of the model's `supported_datasets()`; None means its default.
+        num_processes: Number of CPU data-parallel processes.
+        num_threads: Total torch threads to split across processes; defaults to all cores.
+        patience: Epochs without validation improvement before stopping; None disables early stopping.
+        precision: "fp32", or "bf16" for bfloat16 autocast (also on the CPU).
+        accumulate_grad_batches: Batches whose gradients are accumulated per optimizer step.
+
+    Returns:
+        model, metrics: The trained model and a dict with "epochs",
+        "accuracy" (on the test loader), "train_time" in seconds,
+        "samples_per_sec", "num_processes", "stopped_early" and "resumed_from_epoch".
     """
     Model = ModelRegistry.get(model_name)
     
-    model = Model.build(model_name)
-    train_loader, _ = Model.get_dataloader()
-    
+    model = Model.build(max_epochs=num_epochs)
+    train_loader, test_loader = Model.get_dataloader(loader_config, dataset=dataset)
+
+    last_path = resume_path(ckpt_path)
+    callbacks = list(callbacks or []) + [
+        SaveFinalCheckpoint(ckpt_path),
+        ModelCheckpoint(
+            dirpath=os.path.dirname(last_path) or ".",
+            filename=os.path.splitext(os.path.basename(last_path))[0],
+            save_top_k=1,
+            enable_version_counter=False,
+        ),
+    ]
+    if patience is not None:
+        callbacks.append(EarlyStopping(monitor="valid_loss", mode="min", patience=patience))
+
+    if num_processes > 1:
+        # Lightning shards the training set with a DistributedSampler per rank
+        num_threads = num_threads or os.cpu_count() or 1
+        callbacks.append(ThreadsPerProcess(max(1, num_threads // num_processes)))
+        devices = {
+            "accelerator": "cpu",
+            "devices": num_processes,
+            "strategy": DDPStrategy(process_group_backend="gloo", start_method="spawn"),
+        }
+    else:
+        devices = {"accelerator": "auto", "devices": 1}
+
     trainer = pl.Trainer(
-        devices=1 if torch.cuda.is_available() else "cpu",
         max_epochs=num_epochs,
         logger=False,
-        enable_progress_bar=False
+        enable_progress_bar=False,
+        callbacks=callbacks,
+        precision=PRECISIONS[precision],
+        accumulate_grad_batches=accumulate_grad_batches,
+        **devices,
     )
 
-    trainer.fit(model, train_loader)
-    trainer.save_checkpoint("model.ckpt")
-    return model
+    resume_from, start_epoch = None, 0
+    if os.path.exists(last_path):
+        resume_from = last_path
+        # Saved mid-training, so "epoch" is the 0-based index of the last finished epoch
+        start_epoch = torch.load(last_path, map_location="cpu", weights_only=False)["epoch"] + 1
+
+    start = time.perf_counter()
+    trainer.fit(model, train_loader, test_loader, ckpt_path=resume_from)
+    train_time = time.perf_counter() - start
+
+    # Read the epoch count from the checkpoint, since spawned ranks do not
+    # share their loop state with this process
+    epochs = torch.load(ckpt_path, map_location="cpu", weights_only=False)["epoch"]
+    os.remove(last_path)
+
+    trained = epochs - start_epoch
+    metrics = {
+        "epochs": epochs,
+        "accuracy": evaluate_accuracy(model, test_loader),
+        "train_time": train_time,
+        "samples_per_sec": len(train_loader.dataset) * trained / train_time if train_time > 0 else 0.0,
+        "num_processes": num_processes,
+        "stopped_early": epochs < num_epochs,
+        "resumed_from_epoch": start_epoch,
+    }
+    return model, metrics
+
+
+def scaling_efficiency(metrics, baseline):
+    """
+    Data-parallel scaling efficiency: throughput with N processes divided by
+    N times the single-process throughput. 1.0 is perfect linear scaling.
+
+    Args:
+        metrics: Metrics of the multi-process run from `train_model`.
+        baseline: Metrics of a single-process run of the same configuration.
+
+    Returns:
+        float: The efficiency, or None if either throughput is missing.
+    """
+    if not metrics.get("samples_per_sec") or not baseline.get("samples_per_sec"):
+        return None
+
+    return metrics["samples_per_sec"] / (metrics.get("num_processes", 1) * baseline["samples_per_sec"])
@@ -1,42 +1,47 @@
-# Core pages
-from views.home_page import home_page
-from views.hub_page import hub_page
-from views.chatbot.chatbot_page import chatbot_page
-from views.train_page import train_model_page
+import importlib
 
-# Demos
-from views.demos.video_demo.video_demo import video_demo_page
-from views.demos.domain_demo.domain_adaptation_demo import domain_adaptation_page
+# Each route maps a page slug to "module.path:function". Page modules are only
+# imported the first time they are visited, so opening the home page does not
+# pull in the chatbot backend, torch or kale.
+ROUTES = {
+    # Core pages
+    "home": "views.home_page:home_page",
+    "hub": "views.hub_page:hub_page",
+    "chatbot_page": "views.chatbot.chatbot_page:chatbot_page",
+    "train_page": "views.train_page:train_model_page",
 
-# Guides
-from views.guides.introduction_guide import introduction_page
-from views.guides.kale_api_guide.kale_api_guide import kale_api_page
-from views.guides.kale_api_guide.embed_page import embed_page
-from views.guides.kale_api_guide.loaddata_page import loaddata_page
-from views.guides.kale_api_guide.prepdata_page import prepdata_page
-from views.guides.kale_api_guide.predict_page import predict_page
-from views.guides.kale_api_guide.evaluate_page import evaluate_page
-from views.guides.kale_api_guide.interpret_page import interpret_page
-from views.guides.kale_api_guide.pipeline_page import pipeline_page
+    # Demos
+    "video_example": "views.demos.video_demo.video_demo:video_demo_page",
+    "domain_adaptation": "views.demos.domain_demo.domain_adaptation_demo:domain_adaptation_page",
 
+    # Guides
+    "introduction": "views.guides.introduction_guide:introduction_page",
+    "kale_api": "views.guides.kale_api_guide.kale_api_guide:kale_api_page",
+    "loaddata_page": "views.guides.kale_api_guide.loaddata_page:loaddata_page",
+    "prepdata_page": "views.guides.kale_api_guide.prepdata_page:prepdata_page",
+    "embed_page": "views.guides.kale_api_guide.embed_page:embed_page",
+    "predict_page": "views.guides.kale_api_guide.predict_page:predict_page",
+    "evaluate_page": "views.guides.kale_api_guide.evaluate_page:evaluate_page",
+    "interpret_page": "views.guides.kale_api_guide.interpret_page:interpret_page",
+    "pipeline_page": "views.guides.kale_api_guide.pipeline_page:pipeline_page",
+}
 
+_loaded_pages = {}
 
-ROUTES = {
-    "home": home_page,
-    "hub": hub_page,
-    "chatbot_page": chatbot_page,
-    "train_page": train_model_page,
-    "video_example": video_demo_page,
-    "domain_adaptation": domain_adaptation_page,
-    "introduction": introduction_page,
-    "kale_api": kale_api_page,
-    "loaddata_page": loaddata_page,
-    "prepdata_page": prepdata_page,
-    "embed_page": embed_page,
-    "predict_page": predict_page,
-    "evaluate_page": evaluate_page,
-    "interpret_page": interpret_page,
-    "pipeline_page": pipeline_page,
-}
 
+def get_page(slug):
+    """
+    Resolve a page slug to its render function, importing the page module on first use.
+
+    Args:
+        slug: The route key, e.g. "home" or "chatbot_page".
+
+    Returns:
+        callable: The page function registered for `slug`.
+    """
+    if slug not in _loaded_pages:
+        module_path, func_name = ROUTES[slug].split(":")
+        module = importlib.import_module(module_path)
+        _loaded_pages[slug] = getattr(module, func_name)
 
+    return _loaded_pages[slug]
@@ -4,6 +4,38 @@
 N_SAMPLES = 200
 DEFAULT_SEED = 29118
 
+# ==========================
+# Chatbot backend
+# ==========================
+CHROMA_PERSIST_DIR = "chroma_db"
+CHROMA_COLLECTION = "pykale_xml"
+EMBEDDING_BACKEND = "openai"
+LOCAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+OPENAI_MAX_CONNECTIONS = 32
+OPENAI_TIMEOUT = 60.0
+
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = 24 * 60 * 60
+QUERY_CACHE_PATH = "chroma_db/query_cache.sqlite"
+LEXICAL_INDEX_PATH = "chroma_db/lexical_index.npz"
+# Identifiers in at most this fraction of chunks skip dense search
+IDENTIFIER_MAX_DOC_FRACTION = 0.03
+
+CONTEXT_TOKEN_BUDGET = 6000
+SUMMARY_TOKEN_BUDGET = 300
+
+# ==========================
+# Video demo
+# ==========================
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+# Every cached frame takes one fixed-size slot, so this is both the largest
+# frame that is cached and the space each frame uses. 1 MiB holds a decoded
+# RGB frame up to 640x480 (or anything drafted down to 299-ish with
+# `decode_size`); larger frames bypass the cache and count as "skipped" in
+# its stats, and much smaller ones leave most of their slot unused. Match it
+# to the decoded frame size of the dataset, e.g. 6 MiB for 1920x1080 frames.
+FRAME_CACHE_SLOT_BYTES = 1024 * 1024
+
 # ==========================
 # UI styling constants
 # ==========================
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+logger = logging.getLogger("pykale.metrics")
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of `values`.
+
+    Args:
+        values: A non-empty sequence of numbers.
+        q: Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Metrics:
+    """
+    Process-wide timing and counter registry.
+
+    Each stage keeps its most recent observations in a bounded window, from which
+    p50/p95 are computed. Every observation is also emitted as a JSON log line.
+    """
+
+    def __init__(self, window=1000):
+        """
+        Args:
+            window: Number of recent observations kept per stage.
+        """
+        self.window = window
+        self._observations = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        """
+        Record one observation (milliseconds for spans, raw counts otherwise).
+        """
+        with self._lock:
+            if name not in self._observations:
+                self._observations[name] = deque(maxlen=self.window)
+            self._observations[name].append(value)
+
+        logger.info(json.dumps({"metric": name, "value": round(value, 3), **labels}))
+
+    def increment(self, name, amount=1):
+        """
+        Add `amount` to a monotonically increasing counter.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Time the enclosed block and record it in milliseconds under `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000, **labels)
+
+    def summary(self):
+        """
+        Returns:
+            dict: Stage name -> {"count", "p50", "p95"} over the current window.
+        """
+        with self._lock:
+            observations = {name: list(values) for name, values in self._observations.items()}
+
+        return {
+            name: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+            }
+            for name, values in sorted(observations.items())
+            if values
+        }
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def to_prometheus(self):
+        """
+        Render all stages and counters in the Prometheus text exposition format.
+        """
+        lines = []
+
+        for name, stats in self.summary().items():
+            metric = "pykale_" + name.replace(".", "_")
+            lines.append(f"# TYPE {metric} summary")
+            lines.append(f'{metric}{{quantile="0.5"}} {stats["p50"]}')
+            lines.append(f'{metric}{{quantile="0.95"}} {stats["p95"]}')
+            lines.append(f"{metric}_count {stats['count']}")
+
+        for name, value in sorted(self.counters().items()):
+            metric = "pykale_" + name.replace(".", "_") + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def configure_logging(level=None):
+    """
+    Send the structured metric log lines to stderr, one JSON object per line.
+    Does nothing if the "pykale.metrics" logger already has a handler, so an
+    application's own logging configuration takes precedence.
+
+    Args:
+        level: Log level name (case-insensitive); defaults to the METRICS_LOG_LEVEL
+            env var, then "INFO". "WARNING" silences the per-observation lines.
+            Unknown names fall back to "INFO" with a warning.
+    """
+    if logger.handlers:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    name = str(level or os.getenv("METRICS_LOG_LEVEL") or "INFO").upper()
+    if not isinstance(logging.getLevelName(name), int):
+        logger.setLevel(logging.INFO)
+        logger.warning(f"Unknown metrics log level '{name}', using INFO")
+        return
+    logger.setLevel(name)
+
+
+def start_metrics_server(port, metrics=METRICS, host=None):
+    """
+    Serve `metrics.to_prometheus()` on http://<host>:<port>/metrics from a daemon thread.
+
+    Args:
+        port: TCP port to listen on.
+        metrics: The registry to expose.
+        host: Interface to bind; defaults to the METRICS_HOST env var, then 127.0.0.1.
+            Use 0.0.0.0 to expose the endpoint beyond this machine.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host or os.getenv("METRICS_HOST", "127.0.0.1"), port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
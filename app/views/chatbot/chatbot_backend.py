@@ -1,16 +1,110 @@
 import os
+import re
+import atexit
 
+import httpx
 import streamlit as st
 from openai import OpenAI
 from dotenv import load_dotenv
 
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+
+from utils.constants import (
+    CHROMA_COLLECTION,
+    CHROMA_PERSIST_DIR,
+    EMBEDDING_BACKEND,
+    IDENTIFIER_MAX_DOC_FRACTION,
+    LOCAL_EMBEDDING_MODEL,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_TIMEOUT,
+    LEXICAL_INDEX_PATH,
+    QUERY_CACHE_PATH,
+    QUERY_CACHE_SIZE,
+    QUERY_CACHE_TTL,
+)
+from utils.metrics import METRICS
+from views.chatbot.query_cache import TTLCache, normalize_query
+from views.chatbot.embeddings import get_embeddings, warm_up, collection_name
+from views.chatbot.lexical_index import LexicalIndex, is_identifier, reciprocal_rank_fusion, WORD_PATTERN
+
+
+# HTTP clients opened by the cached backend, closed on teardown.
+_http_clients = []
+
+
+def _backend_is_healthy(backend):
+    """
+    Health check run by Streamlit before handing out the cached backend.
+    An unhealthy backend is closed and rebuilt on the next call.
+
+    Args:
+        backend: The (client, chroma_db) tuple returned by `_load_chatbot_backend`.
+
+    Returns:
+        bool: True if the HTTP client is open and the collection responds.
+    """
+    client, chroma_db = backend
+
+    if client.is_closed():
+        return False
+
+    try:
+        chroma_db._collection.count()
+    except Exception:
+        client.close()
+        return False
+
+    return True
+
+
+@st.cache_resource(show_spinner=False, validate=_backend_is_healthy)
+def _load_chatbot_backend(api_key, embedding_backend):
+    """
+    Builds the OpenAI client and Chroma handle once per server process.
+    The chat client and the embeddings share a single pooled HTTP client.
+    Local embedding backends are warmed up here so the first question
+    does not pay for model loading.
+
+    Args:
+        api_key: OpenAI API key.
+        embedding_backend: Embedding backend name, see `get_embeddings`.
+
+    Returns:
+        client, chroma_db
+    """
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+        ),
+        timeout=OPENAI_TIMEOUT,
+    )
+    _http_clients.append(http_client)
+
+    client = OpenAI(api_key=api_key, http_client=http_client)
+
+    embeddings = get_embeddings(
+        embedding_backend,
+        api_key=api_key,
+        http_client=http_client,
+        model_name=LOCAL_EMBEDDING_MODEL,
+    )
+    warm_up(embeddings)
+
+    chroma_db = Chroma(
+        collection_name=collection_name(embedding_backend, CHROMA_COLLECTION, model_name=LOCAL_EMBEDDING_MODEL),
+        embedding_function=embeddings,
+        persist_directory=CHROMA_PERSIST_DIR,
+    )
+
+    return client, chroma_db
 
 
 def init_chatbot_backend():
     """
-    Loads environment variables and initializes the OpenAI client and Chroma DB.
+    Loads environment variables and returns the process-wide OpenAI client and Chroma DB.
+    Every session shares the same cached backend. The embedding backend can be
+    overridden with the EMBEDDING_BACKEND environment variable.
 
     Returns:
         client, chroma_db
@@ -22,31 +116,139 @@ def init_chatbot_backend():
         st.error("OPENAI_API_KEY not found. Please set it in your environment or .env file.")
         st.stop()
 
-    client = OpenAI(api_key=api_key)
+    embedding_backend = os.getenv("EMBEDDING_BACKEND", EMBEDDING_BACKEND)
 
-    embeddings = OpenAIEmbeddings(openai_api_key=api_key)
-    chroma_db = Chroma(
-        collection_name="pykale_xml",
-        embedding_function=embeddings,
-        persist_directory="chroma_db",
+    return _load_chatbot_backend(api_key, embedding_backend)
+
+
+def close_chatbot_backend():
+    """
+    Drops the cached backend and closes its pooled HTTP connections.
+    The next call to `init_chatbot_backend` builds a fresh one.
+    """
+    _load_chatbot_backend.clear()
+
+    while _http_clients:
+        _http_clients.pop().close()
+
+
+atexit.register(close_chatbot_backend)
+
+
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_caches(namespace):
+    """
+    Builds the process-wide query caches for one collection.
+    Query embeddings are persisted to sqlite; chunk lists are kept in memory only,
+    so a rebuilt index is picked up once the TTL expires or the server restarts.
+
+    Args:
+        namespace: Collection name, so each embedding backend and model gets its own cache.
+
+    Returns:
+        embedding_cache, chunk_cache
+    """
+    os.makedirs(os.path.dirname(QUERY_CACHE_PATH), exist_ok=True)
+    # The namespace becomes an sqlite table name
+    namespace = re.sub(r"\W", "_", namespace)
+
+    embedding_cache = TTLCache(
+        max_size=QUERY_CACHE_SIZE,
+        ttl=QUERY_CACHE_TTL,
+        db_path=QUERY_CACHE_PATH,
+        namespace=f"query_embeddings_{namespace}",
     )
+    chunk_cache = TTLCache(max_size=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
 
-    return client, chroma_db
+    return embedding_cache, chunk_cache
 
 
+@st.cache_resource(show_spinner=False)
+def load_lexical_index(path=LEXICAL_INDEX_PATH):
+    """
+    Loads the BM25 index written by `scripts/build_chroma.py`.
 
+    Returns:
+        LexicalIndex, or None if the index has not been built.
+    """
+    if not os.path.exists(path):
+        return None
 
-def retrieve_relevant_chunks(chroma_db, query, k=3) -> str:
+    return LexicalIndex.load(path)
+
+
+def dense_search(chroma_db, query, k, embedding_cache):
     """
-    Search Chroma DB for the top-k chunks relevant to `query`.
-    Return them combined into a single context string.
+    Vector search in Chroma, reusing cached query embeddings.
+
+    Returns:
+        list: Chunk texts, best first.
     """
-    results = chroma_db.similarity_search(query, k=k)
-    context_blocks = []
+    embedding = embedding_cache.get(query)
+    if embedding is None:
+        with METRICS.span("retrieval.embed"):
+            embedding = chroma_db.embeddings.embed_query(query)
+        embedding_cache.set(query, embedding)
 
-    for doc in results:
-        content = doc.page_content
-        context_blocks.append(f"{content}")
+    with METRICS.span("retrieval.vector_search"):
+        results = chroma_db.similarity_search_by_vector(embedding, k=k)
 
-    return "\n".join(context_blocks)
+    return [doc.page_content for doc in results]
 
+
+def retrieve_chunks(chroma_db, query, k=3):
+    """
+    Search for the top-k chunks relevant to `query`.
+
+    Queries that name a rare PyKale code identifier (e.g. `CoIRLS`, found in
+    few chunks) are answered from the local BM25 index alone. Other queries,
+    including ones that only mention common names such as `PyKale` or `CNN`,
+    fuse the BM25 and vector rankings with reciprocal rank fusion. Without a lexical index this falls
+    back to vector search only.
+
+    Repeated questions are served from the (query, k) chunk cache, and the
+    query embedding is cached so a new `k` skips the embedding round trip.
+
+    Returns:
+        list: The retrieved chunk texts, most relevant first.
+    """
+    embedding_cache, chunk_cache = get_query_caches(chroma_db._collection.name)
+    lexical_index = load_lexical_index()
+    normalized = normalize_query(query)
+
+    chunk_key = f"{k}:{normalized}"
+    context_blocks = chunk_cache.get(chunk_key)
+
+    if context_blocks is not None:
+        METRICS.increment("retrieval.cache_hits")
+        return context_blocks
+
+    if lexical_index is None:
+        context_blocks = dense_search(chroma_db, normalized, k, embedding_cache)
+    else:
+        # Identifiers are matched case-sensitively against the raw query
+        identifiers = [
+            word for word in WORD_PATTERN.findall(query)
+            if is_identifier(word) and lexical_index.is_rare(word, IDENTIFIER_MAX_DOC_FRACTION)
+        ]
+        with METRICS.span("retrieval.lexical_search"):
+            lexical_hits = lexical_index.search(query, k=2 * k)
+
+        if identifiers and lexical_hits:
+            context_blocks = lexical_hits[:k]
+        else:
+            dense_hits = dense_search(chroma_db, normalized, 2 * k, embedding_cache)
+            context_blocks = reciprocal_rank_fusion([dense_hits, lexical_hits])[:k]
+
+    chunk_cache.set(chunk_key, context_blocks)
+    return context_blocks
+
+
+def retrieve_relevant_chunks(chroma_db, query, k=3) -> str:
+    """
+    Search Chroma DB for the top-k chunks relevant to `query`.
+    Return them combined into a single context string.
+    """
+    return "\n".join(retrieve_chunks(chroma_db, query, k=k))
@@ -0,0 +1,153 @@
+import math
+import logging
+from functools import lru_cache
+
+
+# Average characters per token for English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """
+    The gpt-4o tokenizer, loaded on first use. tiktoken downloads its BPE file
+    the first time, so this returns None when it is missing or offline.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable, estimating token counts from length: %s", e)
+        return None
+
+
+def count_tokens(text):
+    """
+    Count tokens in `text` using the gpt-4o tokenizer, or estimate them from
+    the character count if the tokenizer cannot be loaded.
+
+    Args:
+        text: The string to measure.
+
+    Returns:
+        int: Number of tokens.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def summarize_turns(turns, budget):
+    """
+    Build a short extractive summary of dropped turns by listing the user's
+    earlier questions, newest first, until `budget` tokens are used.
+
+    Args:
+        turns: Dropped user/assistant messages, oldest first.
+        budget: Maximum tokens for the summary.
+
+    Returns:
+        str: The summary, or an empty string if nothing fits.
+    """
+    header = "Earlier in this conversation the user asked about:"
+    lines = []
+    used = count_tokens(header)
+
+    for msg in reversed(turns):
+        if msg["role"] != "user":
+            continue
+
+        line = f"- {msg['content'][:200]}"
+        cost = count_tokens(line)
+        if used + cost > budget:
+            break
+
+        lines.append(line)
+        used += cost
+
+    if not lines:
+        return ""
+
+    return "\n".join([header] + lines[::-1])
+
+
+def build_prompt(system_prompt, history, chunks, budget=6000, summary_budget=300):
+    """
+    Assemble the messages sent to the model within a token budget.
+
+    The window always holds the system prompt and the context retrieved for the
+    latest question. Older turns are kept newest first while they fit; the rest
+    are dropped and replaced by a short summary. Retrieved chunks that are
+    duplicated or already quoted in the kept turns are skipped.
+
+    Args:
+        system_prompt: The assistant's system prompt.
+        history: User/assistant messages, oldest first, ending with the new question.
+        chunks: Retrieved context chunks for the new question.
+        budget: Maximum prompt tokens.
+        summary_budget: Maximum tokens for the summary of dropped turns.
+
+    Returns:
+        messages, token_counts
+    """
+    counts = {"system": count_tokens(system_prompt)}
+    remaining = budget - counts["system"]
+
+    # Always keep the latest question
+    latest = history[-1]
+    kept = [latest]
+    counts["history"] = count_tokens(latest["content"])
+    remaining -= counts["history"]
+
+    # Context for the latest question, without duplicates
+    unique_chunks = []
+    context_tokens = 0
+    for chunk in dict.fromkeys(chunks):
+        cost = count_tokens(chunk)
+        if context_tokens + cost > remaining - summary_budget:
+            break
+        unique_chunks.append(chunk)
+        context_tokens += cost
+
+    counts["context"] = context_tokens
+    remaining -= context_tokens + summary_budget
+
+    # Fill the rest of the window with the most recent turns
+    older = history[:-1]
+    cutoff = len(older)
+    for i in range(len(older) - 1, -1, -1):
+        cost = count_tokens(older[i]["content"])
+        if cost > remaining:
+            break
+        remaining -= cost
+        counts["history"] += cost
+        cutoff = i
+
+    kept = older[cutoff:] + kept
+    unique_chunks = [
+        chunk for chunk in unique_chunks
+        if not any(chunk in msg["content"] for msg in kept)
+    ]
+    counts["context"] = sum(count_tokens(chunk) for chunk in unique_chunks)
+
+    summary = summarize_turns(older[:cutoff], summary_budget)
+    counts["summary"] = count_tokens(summary) if summary else 0
+    counts["dropped_turns"] = cutoff
+
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary:
+        messages.append({"role": "system", "content": summary})
+    messages.extend(kept[:-1])
+    if unique_chunks:
+        messages.append({
+            "role": "system",
+            "content": "Relevant context:\n" + "\n".join(unique_chunks)
+        })
+    messages.append(kept[-1])
+
+    counts["total"] = counts["system"] + counts["summary"] + counts["history"] + counts["context"]
+    return messages, counts
@@ -1,11 +1,14 @@
+import time
 import streamlit as st
+from utils.metrics import METRICS
 from utils.ui_utils import render_placeholder_buttons
 from utils.helper_utils import load_file, remove_placeholders
-from views.chatbot.chatbot_backend import init_chatbot_backend, retrieve_relevant_chunks
+from utils.constants import CONTEXT_TOKEN_BUDGET, SUMMARY_TOKEN_BUDGET
+from views.chatbot.chatbot_backend import init_chatbot_backend, retrieve_chunks
+from views.chatbot.context_manager import build_prompt
+from views.chatbot.stream_renderer import StreamRenderer
 
 
-# Setup OpenAI + Chroma backend
-client, chroma_db = init_chatbot_backend()
 SYSTEM_PROMPT = load_file("./data/pykale_prompt.txt")
 
 
@@ -14,18 +17,13 @@ def display_chatbot():
     Displays a chat interface using Streamlit's chat API.
     Integrates with the OpenAI API to generate responses.
     """
+    # Shared OpenAI + Chroma backend
+    client, chroma_db = init_chatbot_backend()
 
-    # Initialize chat history
+    # Initialize chat history (user and assistant turns only)
     if "messages" not in st.session_state:
         st.session_state["messages"] = []
 
-    # Inject system prompt 
-    if not any(msg["role"] == "system" for msg in st.session_state["messages"]):
-        st.session_state["messages"].append({
-            "role": "system",
-            "content": SYSTEM_PROMPT
-        })
-
     # Display chat history
     for msg in st.session_state["messages"]:
         if msg["role"] == "system":
@@ -42,34 +40,58 @@ def display_chatbot():
         with st.chat_message("user"):
             st.write(user_text)
 
-        # Retrieve relevant context
-        context = retrieve_relevant_chunks(chroma_db, user_text, k=3)
+        turn_start = time.perf_counter()
 
-        # Inject
-        st.session_state["messages"].append({
-            "role": "system",
-            "content": f"Relevant context:\n{context}"
-        })
+        # Retrieve relevant context
+        with METRICS.span("retrieval.total"):
+            chunks = retrieve_chunks(chroma_db, user_text, k=3)
+
+        # Fit system prompt, latest context and recent turns into the token budget
+        history = [msg for msg in st.session_state["messages"] if msg["role"] != "system"]
+        messages, token_counts = build_prompt(
+            SYSTEM_PROMPT,
+            history,
+            chunks,
+            budget=CONTEXT_TOKEN_BUDGET,
+            summary_budget=SUMMARY_TOKEN_BUDGET,
+        )
+        st.session_state["token_counts"] = token_counts
+        METRICS.observe("tokens.prompt_estimate", token_counts["total"])
 
         # Stream response from OpenAI
         with st.chat_message("assistant"):
             text_placeholder = st.empty()
-            full_response = ""
+            renderer = StreamRenderer(text_placeholder)
+
+            request_start = time.perf_counter()
+            first_token_at = None
 
             response_stream = client.chat.completions.create(
                 model="gpt-4o",
-                messages=st.session_state["messages"],
-                stream=True
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
             )
 
             for chunk in response_stream:
+                if chunk.usage:
+                    METRICS.observe("tokens.prompt", chunk.usage.prompt_tokens)
+                    METRICS.observe("tokens.completion", chunk.usage.completion_tokens)
+
                 if chunk.choices:
                     delta = chunk.choices[0].delta
                     if hasattr(delta, "content") and delta.content:
-                        full_response += delta.content
-                        text_placeholder.markdown(full_response)
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            METRICS.observe("chat.time_to_first_token", (first_token_at - request_start) * 1000)
+                        renderer.write(delta.content)
+
+            full_response = renderer.text
 
 
+        if first_token_at is not None:
+            METRICS.observe("chat.stream", (time.perf_counter() - first_token_at) * 1000)
+
         # Save response to session state
         st.session_state["messages"].append({
             "role": "assistant",
@@ -81,3 +103,32 @@ def display_chatbot():
         final_text = remove_placeholders(full_response)
         text_placeholder.markdown(final_text)
         render_placeholder_buttons(full_response)
+        METRICS.observe("chat.turn", (time.perf_counter() - turn_start) * 1000)
+
+        st.caption(
+            f"Prompt tokens: {token_counts['total']} "
+            f"(context {token_counts['context']}, history {token_counts['history']}, "
+            f"{token_counts['dropped_turns']} older turns summarised)"
+        )
+
+    # Optional latency panel
+    if st.toggle("Show latency stats", key="chat_latency_panel"):
+        render_latency_panel()
+
+
+def render_latency_panel():
+    """
+    Shows p50/p95 per chat stage across all sessions on this server.
+    Timings are in milliseconds, token stages are in tokens.
+    """
+    summary = METRICS.summary()
+
+    if not summary:
+        st.info("No chat turns recorded yet.")
+        return
+
+    st.table([
+        {"stage": name, "count": stats["count"], "p50": round(stats["p50"], 1), "p95": round(stats["p95"], 1)}
+        for name, stats in summary.items()
+    ])
+    st.caption(f"Counters: {METRICS.counters()}")
@@ -0,0 +1,163 @@
+import re
+import math
+import hashlib
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+EMBEDDING_BACKENDS = ["openai", "transformer", "hashing"]
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words embeddings using the hashing trick.
+    Needs no network or model weights, so it can stand in for a remote
+    embedding model when building or benchmarking the index offline.
+    """
+
+    def __init__(self, dim=1024):
+        """
+        Args:
+            dim: Length of the output vectors.
+        """
+        self.dim = dim
+
+    def _embed(self, text):
+        vector = [0.0] * self.dim
+
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dim] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class TransformerEmbeddings(Embeddings):
+    """
+    Local CPU sentence embeddings from a Hugging Face encoder using mean pooling.
+    The model is loaded on first use; point `model_name` at a local directory
+    (or pre-populate the Hugging Face cache) for air-gapped deployments.
+    """
+
+    def __init__(self, model_name=DEFAULT_LOCAL_MODEL, batch_size=32, max_length=256):
+        """
+        Args:
+            model_name: Hugging Face model ID or local path.
+            batch_size: Texts per forward pass.
+            max_length: Maximum tokens per text.
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Embedding workers call this concurrently; only the first one loads the model
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from transformers import AutoModel, AutoTokenizer
+
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                    self._model = AutoModel.from_pretrained(self.model_name).eval()
+
+    def embed_documents(self, texts):
+        import torch
+
+        self._load()
+        vectors = []
+
+        with torch.inference_mode():
+            for i in range(0, len(texts), self.batch_size):
+                batch = self._tokenizer(
+                    texts[i:i + self.batch_size],
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_length,
+                    return_tensors="pt",
+                )
+                hidden = self._model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, dim=-1)
+                vectors.extend(pooled.tolist())
+
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def get_embeddings(backend, api_key=None, http_client=None, model_name=DEFAULT_LOCAL_MODEL):
+    """
+    Builds the embedding function for the given backend.
+
+    Args:
+        backend: One of `EMBEDDING_BACKENDS`.
+        api_key: OpenAI API key, only used by the "openai" backend.
+        http_client: Optional shared httpx client for the "openai" backend.
+        model_name: Model used by the "transformer" backend.
+
+    Returns:
+        Embeddings: A LangChain embeddings object.
+    """
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(openai_api_key=api_key, http_client=http_client)
+
+    if backend == "transformer":
+        return TransformerEmbeddings(model_name=model_name)
+
+    if backend == "hashing":
+        return HashingEmbeddings()
+
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+
+
+def warm_up(embeddings):
+    """
+    Runs one query through a local backend so model loading and the first
+    forward pass happen at startup rather than on the first user question.
+    """
+    if not isinstance(embeddings, (TransformerEmbeddings, HashingEmbeddings)):
+        return
+
+    embeddings.embed_query("warm up")
+
+
+def model_slug(model_name):
+    """
+    A short identifier for `model_name` that is safe in Chroma collection names
+    and sqlite table names: the lower-cased last path component with runs of
+    other characters replaced by "_", plus a hash of the full name.
+    """
+    stem = re.sub(r"[^a-z0-9]+", "_", model_name.rstrip("/").split("/")[-1].lower()).strip("_")[:24]
+    digest = hashlib.sha1(model_name.encode("utf-8")).hexdigest()[:8]
+    return f"{stem}_{digest}" if stem else digest
+
+
+def collection_name(backend, base="pykale_xml", model_name=DEFAULT_LOCAL_MODEL):
+    """
+    Vectors from different backends or models are not comparable, so each gets
+    its own Chroma collection; the "transformer" name includes the model.
+    The OpenAI backend keeps the original name.
+    """
+    if backend == "openai":
+        return base
+    if backend == "transformer":
+        return f"{base}_{backend}_{model_slug(model_name)}"
+    return f"{base}_{backend}"
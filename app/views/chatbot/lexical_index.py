@@ -0,0 +1,209 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+
+WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text):
+    """
+    Split text into lower-cased terms for the lexical index.
+    Identifiers are kept whole and also split on underscores and camel case,
+    so `select_top_weight` and `VideoFrameDataset` match both exactly and by part.
+
+    Args:
+        text: The string to tokenize.
+
+    Returns:
+        list: Terms in order of appearance.
+    """
+    terms = []
+    for word in WORD_PATTERN.findall(text):
+        terms.append(word.lower())
+
+        parts = [part.lower() for piece in word.split("_") for part in CAMEL_PATTERN.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(parts)
+
+    return terms
+
+
+def is_identifier(word):
+    """
+    True for words shaped like code identifiers: snake_case such as `select_top_weight`,
+    or mixed-case CamelCase such as `CoIRLS` or `VideoFrameDataset`.
+    Acronyms (`CNN`, `MNIST`) and plain words are not identifiers.
+    """
+    if "_" in word.strip("_"):
+        return any(c.isalpha() for c in word)
+    return any(c.islower() for c in word) and any(c.isupper() for c in word[1:])
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Merge several ranked lists with reciprocal rank fusion.
+
+    Args:
+        rankings: Lists of items, best first.
+        k: Damping constant; larger values flatten the contribution of top ranks.
+
+    Returns:
+        list: All items ordered by fused score.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class LexicalIndex:
+    """
+    An in-memory BM25 inverted index over the assistant's text chunks.
+
+    Posting lists are stored as flat numpy arrays (CSR layout): the postings of
+    term `i` are `doc_ids[offsets[i]:offsets[i + 1]]` with matching `tfs`.
+    Chunk texts are stored the same way, so the whole index saves to one
+    `.npz` file and loads without rebuilding any Python structures per posting.
+    """
+
+    def __init__(self, terms, offsets, doc_ids, tfs, doc_lengths, text_bytes, text_offsets, k1=1.5, b=0.75):
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+        self.text_bytes = text_bytes
+        self.text_offsets = text_offsets
+        self.k1 = k1
+        self.b = b
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts):
+        """
+        Build the index from a list of chunk texts.
+        """
+        postings = {}
+        doc_lengths = []
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[term]) for term in terms])
+
+        flat = [posting for term in terms for posting in postings[term]]
+        doc_ids = np.array([doc_id for doc_id, _ in flat], dtype=np.int32)
+        tfs = np.array([tf for _, tf in flat], dtype=np.float32)
+
+        encoded = [text.encode("utf-8") for text in texts]
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(data) for data in encoded])
+        text_bytes = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        return cls(
+            terms, offsets, doc_ids, tfs,
+            np.array(doc_lengths, dtype=np.int32), text_bytes, text_offsets,
+        )
+
+    def save(self, path):
+        """
+        Write the index to a single uncompressed `.npz` file.
+        """
+        terms = sorted(self.vocab, key=self.vocab.get)
+        np.savez(
+            path,
+            terms=np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8),
+            offsets=self.offsets,
+            doc_ids=self.doc_ids,
+            tfs=self.tfs,
+            doc_lengths=self.doc_lengths,
+            text_bytes=self.text_bytes,
+            text_offsets=self.text_offsets,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index written by `save`.
+        """
+        with np.load(path) as data:
+            terms = data["terms"].tobytes().decode("utf-8").split("\n")
+            return cls(
+                terms, data["offsets"], data["doc_ids"], data["tfs"],
+                data["doc_lengths"], data["text_bytes"], data["text_offsets"],
+            )
+
+    def text(self, doc_id):
+        """
+        Return the chunk text stored for `doc_id`.
+        """
+        start, end = self.text_offsets[doc_id], self.text_offsets[doc_id + 1]
+        return self.text_bytes[start:end].tobytes().decode("utf-8")
+
+    def has_term(self, term):
+        return term.lower() in self.vocab
+
+    def document_frequency(self, term):
+        """
+        Number of chunks containing `term`.
+        """
+        term_id = self.vocab.get(term.lower())
+        if term_id is None:
+            return 0
+        return int(self.offsets[term_id + 1] - self.offsets[term_id])
+
+    def is_rare(self, term, max_fraction):
+        """
+        True if `term` occurs in at least one chunk and at most `max_fraction` of them.
+        """
+        df = self.document_frequency(term)
+        return 0 < df <= max(1, max_fraction * len(self))
+
+    def search(self, query, k=3):
+        """
+        Rank chunks against `query` with BM25.
+
+        Args:
+            query: The user's question.
+            k: Number of results.
+
+        Returns:
+            list: Chunk texts, best first. Chunks with no matching term are omitted.
+        """
+        if not len(self):
+            return []
+
+        scores = np.zeros(len(self), dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+
+            df = end - start
+            idf = np.log(1.0 + (len(self) - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[docs] / self.avg_length)
+            scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        k = min(k, len(self))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [self.text(doc_id) for doc_id in top if scores[doc_id] > 0]
@@ -0,0 +1,135 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """
+    Normalise a user query so trivially different phrasings share a cache entry.
+
+    Args:
+        query: Raw user text.
+
+    Returns:
+        str: Lower-cased query with collapsed whitespace.
+    """
+    return " ".join(query.lower().split())
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache with time-to-live eviction and hit/miss counters.
+    Values must be JSON-serialisable when `db_path` is given, in which case
+    entries are also written to a sqlite table so they survive restarts.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, db_path=None, namespace="default"):
+        """
+        Args:
+            max_size: Maximum number of entries kept in memory.
+            ttl: Seconds an entry stays valid.
+            db_path: Optional sqlite file used as a persistent second tier.
+            namespace: Table name used inside `db_path`.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {namespace} "
+                "(key TEXT PRIMARY KEY, value TEXT, stored_at REAL)"
+            )
+            self._db.commit()
+
+    def get(self, key):
+        """
+        Look up `key`, falling back to the sqlite tier on a memory miss.
+
+        Returns:
+            The cached value, or None if missing or expired.
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            self._entries.pop(key, None)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    f"SELECT value, stored_at FROM {self.namespace} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] < self.ttl:
+                    value = json.loads(row[0])
+                    self._store(key, value, row[1])
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """
+        Store `value` under `key` in memory and, if enabled, on disk.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._store(key, value, now)
+
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.namespace} VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now),
+                )
+                self._db.execute(
+                    f"DELETE FROM {self.namespace} WHERE stored_at < ?", (now - self.ttl,)
+                )
+                self._db.commit()
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.namespace}")
+                self._db.commit()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Current size, hits, misses and hit rate.
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _store(self, key, value, stored_at):
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
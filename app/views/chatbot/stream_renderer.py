@@ -0,0 +1,49 @@
+import time
+
+
+class StreamRenderer:
+    """
+    Buffers streamed text deltas and re-renders a Streamlit placeholder only
+    every `interval` seconds or `min_chars` new characters, instead of once per token.
+    """
+
+    def __init__(self, placeholder, interval=0.05, min_chars=200):
+        """
+        Args:
+            placeholder: A Streamlit element created with `st.empty()`.
+            interval: Maximum seconds between renders while text is arriving.
+            min_chars: Render early once this many unrendered characters are buffered.
+        """
+        self.placeholder = placeholder
+        self.interval = interval
+        self.min_chars = min_chars
+
+        self._parts = []
+        self._pending = 0
+        self._last_flush = time.perf_counter()
+
+    @property
+    def text(self):
+        """The full text received so far."""
+        return "".join(self._parts)
+
+    def write(self, delta):
+        """
+        Append a streamed delta and render if the time or size cadence is due.
+        """
+        self._parts.append(delta)
+        self._pending += len(delta)
+
+        now = time.perf_counter()
+        if self._pending >= self.min_chars or now - self._last_flush >= self.interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """
+        Render everything received so far.
+        """
+        text = self.text
+        self._parts = [text]
+        self.placeholder.markdown(text)
+        self._pending = 0
+        self._last_flush = now if now is not None else time.perf_counter()
@@ -59,14 +59,16 @@ def demo_multilabel():
 
     videos_root = os.path.join(os.getcwd(), "datasets/demo_dataset_multilabel")
     annotation_file = os.path.join(videos_root, "annotations.txt")
-    preprocess = get_preprocessor()
+    image_size = 299
+    preprocess = get_preprocessor(image_size)
 
     dataset = get_dataset(
         root_path=videos_root,
         annotation_file=annotation_file,
         num_segments=5,
         frames_per_segment=1,
-        transform=preprocess
+        transform=preprocess,
+        decode_size=image_size,
     )
 
     dataloader = torch.utils.data.DataLoader(
@@ -12,7 +12,7 @@ import streamlit as st
 from views.components.ui import section_block, code_snippet_block
 from utils.helper_utils import load_file
 from utils.ui_utils import display_frames_in_grid
-from views.demos.video_demo.video_backend import get_dataset, get_preprocessor, denormalize
+from views.demos.video_demo.video_backend import get_dataset, get_preprocessor, denormalize, get_frame_cache
 
 
 def demo_transforms():
@@ -55,14 +55,16 @@ def demo_transforms():
 
     videos_root = os.path.join(os.getcwd(), "datasets/demo_dataset")
     annotation_file = os.path.join(videos_root, "annotations.txt")
-    preprocess = get_preprocessor()
+    image_size = 299
+    preprocess = get_preprocessor(image_size)
 
     dataset = get_dataset(
         root_path=videos_root,
         annotation_file=annotation_file,
         num_segments=5,
         frames_per_segment=1,
-        transform=preprocess
+        transform=preprocess,
+        decode_size=image_size,
     )
 
     sample = dataset[1]
@@ -103,4 +105,9 @@ def demo_transforms():
         )
         break
 
+    stats = get_frame_cache().stats()
+    st.caption(
+        f"Decoded-frame cache: {stats['hit_rate']:.0%} hit rate · {stats['entries']} frames · "
+        f"{stats['used_bytes'] / 1e6:.0f} of {stats['budget_bytes'] / 1e6:.0f} MB"
+    )
     st.markdown("---")
@@ -0,0 +1,248 @@
+"""
+Decoded-frame cache in shared memory, shared by the app and its DataLoader workers.
+"""
+
+import os
+import hashlib
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+from kale.loaddata.videos import VideoFrameDataset
+from views.demos.video_demo.frame_decode import decode_frame
+
+
+# Per-slot metadata columns
+_KEY, _NBYTES, _HEIGHT, _WIDTH, _CHANNELS, _LAST_USED = range(6)
+# Global counters
+_TICK, _HITS, _MISSES, _EVICTIONS, _SKIPPED = range(5)
+
+
+def frame_key(path, index, variant=""):
+    """
+    Cache key of one decoded frame: a non-zero int64 hash of its video, index and decode variant.
+    """
+    digest = hashlib.blake2b(f"{path}\0{index}\0{variant}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+class SharedFrameCache:
+    """
+    LRU cache of decoded uint8 frames in a `multiprocessing.shared_memory` slab.
+
+    The slab is split into `budget_bytes // slot_bytes` equal slots, and a second
+    shared block holds each slot's key, shape and last use, plus hit/miss
+    counters. DataLoader workers inherit (or unpickle) the cache and attach to
+    the same blocks, so a frame decoded by any worker is reused by all of them
+    and by later epochs. Every frame occupies a whole slot: frames larger than
+    one slot are not cached (counted as "skipped"), and smaller ones leave the
+    rest of their slot unused, so `slot_bytes` should match the decoded frame size.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024, slot_bytes=1024 * 1024):
+        """
+        Args:
+            budget_bytes: Total size of the frame slab.
+            slot_bytes: Size of one slot; the largest frame that can be cached.
+        """
+        self.slot_bytes = slot_bytes
+        self.num_slots = max(1, budget_bytes // slot_bytes)
+        self._owner = True
+        # A spawn-context lock can be inherited by forked and spawned workers alike
+        self._lock = mp.get_context("spawn").Lock()
+
+        self._data = shared_memory.SharedMemory(create=True, size=self.num_slots * slot_bytes)
+        self._index = shared_memory.SharedMemory(create=True, size=8 * (self.num_slots * 6 + 5))
+        self._attach_views()
+        self._meta[:] = 0
+        self._counters[:] = 0
+
+    def _attach_views(self):
+        self._meta = np.ndarray((self.num_slots, 6), dtype=np.int64, buffer=self._index.buf)
+        self._counters = np.ndarray(5, dtype=np.int64, buffer=self._index.buf, offset=self._meta.nbytes)
+
+    def __getstate__(self):
+        return {
+            "slot_bytes": self.slot_bytes,
+            "num_slots": self.num_slots,
+            "lock": self._lock,
+            "names": (self._data.name, self._index.name),
+        }
+
+    def __setstate__(self, state):
+        self.slot_bytes = state["slot_bytes"]
+        self.num_slots = state["num_slots"]
+        self._owner = False
+        self._lock = state["lock"]
+        self._data = shared_memory.SharedMemory(name=state["names"][0])
+        self._index = shared_memory.SharedMemory(name=state["names"][1])
+        self._attach_views()
+
+    def get(self, key):
+        """
+        Returns:
+            np.ndarray: A copy of the cached frame, or None on a miss.
+        """
+        with self._lock:
+            slots = np.flatnonzero(self._meta[:, _KEY] == key)
+            if len(slots) == 0:
+                self._counters[_MISSES] += 1
+                return None
+
+            slot = slots[0]
+            self._counters[_TICK] += 1
+            self._counters[_HITS] += 1
+            self._meta[slot, _LAST_USED] = self._counters[_TICK]
+
+            height, width, channels = self._meta[slot, _HEIGHT:_CHANNELS + 1]
+            start = slot * self.slot_bytes
+            flat = np.frombuffer(self._data.buf, dtype=np.uint8, count=height * width * channels, offset=start)
+            return flat.reshape(height, width, channels).copy()
+
+    def put(self, key, frame):
+        """
+        Store a uint8 (H, W, C) frame, evicting the least recently used slot if full.
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+
+        with self._lock:
+            if frame.nbytes > self.slot_bytes:
+                self._counters[_SKIPPED] += 1
+                return
+            if np.any(self._meta[:, _KEY] == key):
+                return
+
+            empty = np.flatnonzero(self._meta[:, _KEY] == 0)
+            if len(empty):
+                slot = empty[0]
+            else:
+                slot = int(np.argmin(self._meta[:, _LAST_USED]))
+                self._counters[_EVICTIONS] += 1
+
+            start = slot * self.slot_bytes
+            self._data.buf[start:start + frame.nbytes] = frame.reshape(-1).data
+            self._counters[_TICK] += 1
+            self._meta[slot] = (key, frame.nbytes, *frame.shape, self._counters[_TICK])
+
+    def get_or_load(self, key, load):
+        """
+        Return the cached frame for `key`, or call `load()` for a uint8 array and cache it.
+        """
+        frame = self.get(key)
+        if frame is None:
+            frame = load()
+            self.put(key, frame)
+        return frame
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses, hit rate, evictions, frames too large to cache,
+            entries and bytes in use against the byte budget.
+        """
+        with self._lock:
+            hits, misses = int(self._counters[_HITS]), int(self._counters[_MISSES])
+            used = self._meta[:, _KEY] != 0
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": int(self._counters[_EVICTIONS]),
+                "skipped": int(self._counters[_SKIPPED]),
+                "entries": int(used.sum()),
+                "used_bytes": int(self._meta[used, _NBYTES].sum()),
+                "budget_bytes": self.num_slots * self.slot_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._meta[:] = 0
+            self._counters[:] = 0
+
+    def close(self):
+        """
+        Detach from the shared blocks, and free them if this process created them.
+        """
+        self._meta = self._counters = None
+        for block in (self._data, self._index):
+            block.close()
+            if self._owner:
+                block.unlink()
+
+
+def file_identity(path):
+    """
+    Modification time and size of `path`, so a rewritten file gets new cache keys.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def cached_frame(cache, path, index, load, variant=""):
+    """
+    Load one frame through `cache`, or directly if `cache` is None.
+
+    Args:
+        cache: A `SharedFrameCache` or None.
+        path: Video path, part of the cache key.
+        index: Frame index.
+        load: Callable returning the frame as a PIL image.
+        variant: Decode variant and source identity, part of the cache key.
+
+    Returns:
+        PIL.Image.Image: The frame.
+    """
+    if cache is None:
+        return load()
+
+    frame = cache.get_or_load(frame_key(path, index, variant), lambda: np.asarray(load()))
+    return Image.fromarray(frame[:, :, 0] if frame.shape[2] == 1 else frame)
+
+
+class CachedVideoFrameDataset(VideoFrameDataset):
+    """
+    `VideoFrameDataset` decoding RGB frames through a `SharedFrameCache`.
+
+    With `decode_size`, JPEGs are decoded in draft mode close to that shorter
+    side instead of at full resolution. Without a cache or `decode_size`,
+    transforms that decode frames themselves (with an `accepts_encoded`
+    attribute, e.g. `FusedVideoPreprocessor`) receive the encoded JPEG bytes
+    instead of PIL images, provided `imagefile_template` names JPEG files.
+    """
+
+    def __init__(self, *args, frame_cache=None, decode_size=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frame_cache = frame_cache
+        self.decode_size = decode_size
+
+    @property
+    def returns_encoded(self):
+        return (
+            self.frame_cache is None
+            and self.decode_size is None
+            and self.imagefile_template.lower().endswith((".jpg", ".jpeg"))
+            and getattr(self.transform, "accepts_encoded", False)
+        )
+
+    @property
+    def decode_variant(self):
+        return "" if self.decode_size is None else f"min_side={self.decode_size}"
+
+    def _load_image(self, directory, idx):
+        if self.image_modality != "rgb":
+            return super()._load_image(directory, idx)
+
+        if self.returns_encoded:
+            with open(os.path.join(directory, self.imagefile_template.format(idx)), "rb") as f:
+                return [f.read()]
+
+        path = os.path.join(directory, self.imagefile_template.format(idx))
+        if self.frame_cache is None:
+            return [decode_frame(path, self.decode_size)]
+
+        # The file's identity is part of the key, so edited frames are decoded afresh
+        variant = f"{self.decode_variant}\0{file_identity(path)}"
+        return [cached_frame(self.frame_cache, directory, idx, lambda: decode_frame(path, self.decode_size), variant)]
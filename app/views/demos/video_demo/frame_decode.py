@@ -0,0 +1,40 @@
+"""
+JPEG frame decoding with optional resize-on-decode (PIL draft mode).
+"""
+
+import io
+import math
+
+from PIL import Image
+
+
+def draft_size(width, height, min_side):
+    """
+    Aspect-preserving size whose shorter side is `min_side`.
+    """
+    scale = min_side / min(width, height)
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+def decode_frame(source, min_side=None):
+    """
+    Decode one frame to an RGB PIL image.
+
+    With `min_side`, JPEGs are decoded with DCT scaling (1/2, 1/4 or 1/8) to
+    the smallest size whose shorter side is still at least `min_side`, so a
+    later Resize to `min_side` does far less work and the full-resolution
+    bitmap is never allocated. Other formats are decoded at full size.
+
+    Args:
+        source: File path, encoded bytes, or a binary file object.
+        min_side: Target shorter side, or None to decode at full resolution.
+
+    Returns:
+        PIL.Image.Image: The decoded RGB frame.
+    """
+    image = Image.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+    if min_side is not None and image.format == "JPEG":
+        image.draft("RGB", draft_size(image.width, image.height, min_side))
+
+    return image.convert("RGB")
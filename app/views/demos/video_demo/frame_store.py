@@ -0,0 +1,276 @@
+"""
+Packed frame store for `VideoFrameDataset`-style datasets.
+
+Each video's `img_{:05d}.jpg` folder is packed into a single file, so loading a
+clip opens one file instead of one per sampled frame:
+
+- "jpeg": the original JPEG bytes concatenated, followed by an offset index.
+- "raw": decoded frames as a uint8 (N, H, W, 3) `.npy` array, memory-mapped on read.
+
+A `packed_frames.json` manifest in the dataset root maps every video to its pack.
+"""
+
+import os
+import json
+import struct
+
+import numpy as np
+from PIL import Image
+from views.demos.video_demo.frame_cache import CachedVideoFrameDataset, cached_frame, file_identity
+from views.demos.video_demo.frame_decode import decode_frame
+
+
+PACK_MANIFEST = "packed_frames.json"
+PACK_FORMATS = ["jpeg", "raw"]
+
+# Trailer of a JPEG pack: frame count and a magic tag, after the int64 offsets
+_TRAILER = struct.Struct("<q8s")
+_MAGIC = b"KALEPACK"
+
+
+def frame_indices(frame_dir, template="img_{:05d}.jpg"):
+    """
+    Sorted frame indices in `frame_dir` whose file names match `template`.
+    """
+    prefix, suffix = template.split("{")[0], template.split("}")[-1]
+    indices = []
+
+    for name in os.listdir(frame_dir):
+        if name.startswith(prefix) and name.endswith(suffix):
+            number = name[len(prefix):len(name) - len(suffix)]
+            if number.isdigit():
+                indices.append(int(number))
+
+    return sorted(indices)
+
+
+def pack_video(frame_dir, out_path, fmt="jpeg", size=None, template="img_{:05d}.jpg"):
+    """
+    Pack one video's frame folder into a single file.
+
+    Args:
+        frame_dir: Folder holding the video's frames.
+        out_path: Pack file to write.
+        fmt: "jpeg" keeps the encoded bytes; "raw" stores decoded uint8 frames.
+        size: (height, width) to resize to for "raw"; None keeps the first frame's size.
+        template: Frame file name template.
+
+    Returns:
+        dict: Manifest entry with "file", "first_index" and "num_frames".
+    """
+    if fmt not in PACK_FORMATS:
+        raise ValueError(f"Unknown pack format '{fmt}', expected one of {PACK_FORMATS}")
+
+    indices = frame_indices(frame_dir, template)
+    if not indices:
+        raise ValueError(f"No frames matching '{template}' in {frame_dir}")
+    if indices != list(range(indices[0], indices[0] + len(indices))):
+        raise ValueError(f"Frames in {frame_dir} are not numbered contiguously")
+
+    paths = [os.path.join(frame_dir, template.format(i)) for i in indices]
+    tmp_path = out_path + ".tmp"
+
+    if fmt == "jpeg":
+        offsets = [0]
+        with open(tmp_path, "wb") as out:
+            for path in paths:
+                with open(path, "rb") as f:
+                    offsets.append(offsets[-1] + out.write(f.read()))
+            out.write(np.asarray(offsets, dtype="<i8").tobytes())
+            out.write(_TRAILER.pack(len(paths), _MAGIC))
+    else:
+        if size is None:
+            with Image.open(paths[0]) as first:
+                size = (first.height, first.width)
+
+        frames = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(len(paths), *size, 3))
+        for i, path in enumerate(paths):
+            with Image.open(path) as image:
+                image = image.convert("RGB")
+                if (image.height, image.width) != tuple(size):
+                    image = image.resize((size[1], size[0]), Image.BILINEAR)
+                frames[i] = np.asarray(image)
+        frames.flush()
+        del frames
+
+    os.replace(tmp_path, out_path)
+    return {"file": out_path, "first_index": indices[0], "num_frames": len(indices)}
+
+
+def pack_dataset(root_path, annotation_file, fmt="jpeg", size=None, template="img_{:05d}.jpg", force=False):
+    """
+    Pack every video listed in `annotation_file` and write the manifest.
+
+    Packs are written next to the frame folders (`<video>.pack` or `<video>.npy`).
+    Videos already in an existing manifest with the same format are skipped
+    unless `force` is set. The manifest is written last, so readers never see
+    a half-written store.
+
+    Args:
+        root_path: Dataset root directory.
+        annotation_file: Annotation file listing the videos.
+        fmt: One of `PACK_FORMATS`.
+        size: (height, width) for "raw" packs; required if videos differ in size.
+        template: Frame file name template.
+        force: Repack videos that are already packed.
+
+    Returns:
+        dict: The manifest.
+    """
+    manifest_path = os.path.join(root_path, PACK_MANIFEST)
+    videos = {}
+
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous["format"] == fmt and previous["size"] == (list(size) if size else None):
+            videos = previous["videos"]
+
+    with open(annotation_file, "r", encoding="utf-8") as f:
+        names = list(dict.fromkeys(line.split()[0] for line in f if line.strip()))
+
+    extension = ".pack" if fmt == "jpeg" else ".npy"
+    for name in names:
+        if name in videos:
+            continue
+
+        entry = pack_video(os.path.join(root_path, name), os.path.join(root_path, name + extension), fmt, size, template)
+        entry["file"] = name + extension
+        videos[name] = entry
+
+    manifest = {
+        "format": fmt,
+        "size": list(size) if size else None,
+        "template": template,
+        "videos": videos,
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    return manifest
+
+
+def is_packed(root_path):
+    return os.path.exists(os.path.join(root_path, PACK_MANIFEST))
+
+
+class PackedClip:
+    """
+    Random access to the frames of one packed video through a single open file.
+    """
+
+    def __init__(self, path, fmt, first_index):
+        """
+        Args:
+            path: Pack file written by `pack_video`.
+            fmt: The pack's format.
+            first_index: Frame index stored at position 0.
+        """
+        self.fmt = fmt
+        self.first_index = first_index
+
+        if fmt == "jpeg":
+            self._file = open(path, "rb")
+            self._file.seek(-_TRAILER.size, os.SEEK_END)
+            num_frames, magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+            if magic != _MAGIC:
+                self._file.close()
+                raise ValueError(f"{path} is not a frame pack")
+
+            self._file.seek(-_TRAILER.size - 8 * (num_frames + 1), os.SEEK_END)
+            self._offsets = np.frombuffer(self._file.read(8 * (num_frames + 1)), dtype="<i8")
+        else:
+            self._frames = np.load(path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self._offsets) - 1 if self.fmt == "jpeg" else len(self._frames)
+
+    def encoded(self, index):
+        """
+        The encoded JPEG bytes of frame `index` ("jpeg" packs only).
+        """
+        position = index - self.first_index
+        start, end = self._offsets[position], self._offsets[position + 1]
+        self._file.seek(start)
+        return self._file.read(end - start)
+
+    def frame(self, index, min_side=None):
+        """
+        Frame `index` as an RGB PIL image. `min_side` enables draft-mode
+        decoding for "jpeg" packs (see `decode_frame`); raw frames are already decoded.
+        """
+        if self.fmt == "jpeg":
+            return decode_frame(self.encoded(index), min_side)
+        return Image.fromarray(np.asarray(self._frames[index - self.first_index]))
+
+    def close(self):
+        if self.fmt == "jpeg":
+            self._file.close()
+        else:
+            del self._frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PackedVideoFrameDataset(CachedVideoFrameDataset):
+    """
+    `VideoFrameDataset` reading RGB frames from a packed frame store.
+    Sampling and outputs are unchanged; each clip opens its pack at most once,
+    and not at all if every sampled frame is in the `frame_cache`. Cached frames
+    are keyed by the manifest's format, size and modification time, so a repack
+    never serves frames decoded from the previous store.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        manifest_path = os.path.join(self.root_path, PACK_MANIFEST)
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        self.pack_variant = (
+            f"{self.decode_variant}\0{self.manifest['format']}:{self.manifest['size']}:{file_identity(manifest_path)}"
+        )
+
+    def open_clip(self, record):
+        entry = self.manifest["videos"][os.path.relpath(record.path, self.root_path)]
+        return PackedClip(os.path.join(self.root_path, entry["file"]), self.manifest["format"], entry["first_index"])
+
+    def _get(self, record, indices):
+        # Same frame selection as VideoFrameDataset._get, reading from one pack
+        indices = indices + record.start_frame
+        images = []
+        clips = []
+
+        def load(frame_index):
+            if not clips:
+                clips.append(self.open_clip(record))
+            if self.returns_encoded and clips[0].fmt == "jpeg":
+                return clips[0].encoded(frame_index)
+            return clips[0].frame(frame_index, self.decode_size)
+
+        try:
+            for seg_ind in indices:
+                frame_index = int(seg_ind)
+                for _ in range(self.frames_per_segment):
+                    images.append(
+                        cached_frame(
+                            self.frame_cache, record.path, frame_index, lambda: load(frame_index), self.pack_variant
+                        )
+                    )
+                    if frame_index < record.end_frame:
+                        frame_index += 1
+        finally:
+            for clip in clips:
+                clip.close()
+
+        if self.transform is not None:
+            images = self.transform(images)
+
+        return images, record.label
@@ -5,10 +5,16 @@ https://github.com/pykale/pykale/tree/main/examples/toy_domain_adaptation
 Author: Ravio Koot
 """
 
+import os
+import atexit
 import torch
+import streamlit as st
 from torchvision import transforms
-from kale.loaddata.videos import VideoFrameDataset
 from kale.prepdata.video_transform import ImglistToTensor
+from utils.constants import FRAME_CACHE_BYTES, FRAME_CACHE_SLOT_BYTES
+from views.demos.video_demo.frame_cache import SharedFrameCache, CachedVideoFrameDataset
+from views.demos.video_demo.frame_store import PACK_MANIFEST, PackedVideoFrameDataset
+from views.demos.video_demo.fused_preprocess import FusedVideoPreprocessor
 
 
 def denormalize(video_tensor):
@@ -26,39 +32,104 @@ def denormalize(video_tensor):
 
 
 
+@st.cache_resource
+def get_frame_cache():
+    """
+    One shared-memory decoded-frame cache per server process, inherited by DataLoader workers.
+    """
+    cache = SharedFrameCache(FRAME_CACHE_BYTES, FRAME_CACHE_SLOT_BYTES)
+    atexit.register(cache.close)
+    return cache
+
+
+def transform_signature(transform):
+    """
+    Identifies a transform pipeline by its repr, which for torchvision
+    transforms lists every step and its parameters.
+    """
+    return "none" if transform is None else repr(transform)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _cached_dataset(
+    root_path,
+    annotation_file,
+    annotation_mtime_ns,
+    pack_mtime_ns,
+    num_segments,
+    frames_per_segment,
+    transform_key,
+    use_frame_cache,
+    decode_size,
+    _transform,
+):
+    # The mtimes and transform key are only part of the cache key
+    dataset_cls = CachedVideoFrameDataset if pack_mtime_ns is None else PackedVideoFrameDataset
+    return dataset_cls(
+        root_path=root_path,
+        annotationfile_path=annotation_file,
+        num_segments=num_segments,
+        frames_per_segment=frames_per_segment,
+        imagefile_template="img_{:05d}.jpg",
+        transform=_transform,
+        random_shift=True,
+        test_mode=False,
+        frame_cache=get_frame_cache() if use_frame_cache else None,
+        decode_size=decode_size,
+    )
+
+
 def get_dataset(
     root_path,
     annotation_file,
     num_segments=5,
     frames_per_segment=1,
-    transform=None
+    transform=None,
+    use_frame_cache=True,
+    decode_size=None,
 ):
     """
     Creates a PyKale VideoFrameDataset instance.
 
+    Datasets are cached per server process, keyed on the root path, the
+    annotation file's modification time, the segment config and the transform
+    signature, so reruns reuse the parsed annotations until the file changes.
+    If the root holds a packed frame store (see `frame_store.pack_dataset`),
+    frames are read from it instead of the individual JPEG files. Decoded
+    frames go through the shared `get_frame_cache()`, so they are decoded once
+    for all DataLoader workers, epochs and reruns. With `decode_size`, JPEG
+    frames are decoded in draft mode at roughly that shorter side, which is much
+    cheaper for high-resolution sources that are resized anyway.
+
     Args:
         root_path: Path to dataset root directory.
         annotation_file: Path to annotation file.
         num_segments: Number of temporal segments to sample.
         frames_per_segment: Frames per segment.
         transform: Optional transform pipeline.
+        use_frame_cache: Decode frames through the shared frame cache.
+        decode_size: Shorter side to decode JPEG frames at (at least), or None for full resolution.
 
     Returns:
         VideoFrameDataset: Initialized dataset
     """
-    return VideoFrameDataset(
-        root_path=root_path,
-        annotationfile_path=annotation_file,
-        num_segments=num_segments,
-        frames_per_segment=frames_per_segment,
-        imagefile_template="img_{:05d}.jpg",
-        transform=transform,
-        random_shift=True,
-        test_mode=False,
+    manifest = os.path.join(root_path, PACK_MANIFEST)
+
+    return _cached_dataset(
+        os.path.abspath(root_path),
+        os.path.abspath(annotation_file),
+        os.stat(annotation_file).st_mtime_ns,
+        os.stat(manifest).st_mtime_ns if os.path.exists(manifest) else None,
+        num_segments,
+        frames_per_segment,
+        transform_signature(transform),
+        use_frame_cache,
+        decode_size,
+        transform,
     )
 
 
-def get_preprocessor(image_size=299):
+def get_preprocessor(image_size=299, fused=True, draft=False):
     """
     Returns a preprocessing pipeline for video frames.
 
@@ -70,10 +141,17 @@ def get_preprocessor(image_size=299):
 
     Args:
         image_size: Final height/width after crop
+        fused: Use the batched `FusedVideoPreprocessor` instead of the
+            per-frame torchvision Compose; the outputs are equivalent.
+        draft: Let the fused preprocessor decode encoded JPEG frames in draft
+            mode close to `image_size`.
 
     Returns:
-        torchvision.transforms.Compose: Transform pipeline
+        Transform pipeline
     """
+    if fused:
+        return FusedVideoPreprocessor(image_size, draft=draft)
+
     return transforms.Compose([
         ImglistToTensor(),
         transforms.Resize(image_size),
@@ -1,36 +1,266 @@
+import os
+import time
 import streamlit as st
-from ml_core.train import train_model
+from ml_core.jobs import JobManager
+from ml_core.loader_config import LoaderConfig
 from ml_core.registry import ModelRegistry
+from ml_core.checkpoint_store import CheckpointStore
+from ml_core.train import scaling_efficiency
+from ml_core.optimize import MODES, artifact_path, optimize_checkpoint
+
+
+@st.cache_resource
+def get_checkpoint_store():
+    """
+    One checkpoint store per server process, shared by every session.
+    """
+    return CheckpointStore()
+
+
+@st.cache_resource
+def get_job_manager():
+    """
+    One job manager per server process, shared by every session.
+    """
+    return JobManager(max_concurrent=1, store=get_checkpoint_store())
+
+
+def checkpoint_label(entry):
+    """
+    One-line description of a stored checkpoint for select boxes.
+    """
+    metrics = entry["metrics"]
+    accuracy = metrics.get("accuracy")
+    return " · ".join([
+        entry["id"][:8],
+        str(entry["dataset"]),
+        f"{metrics.get('epochs', entry['hparams'].get('epochs'))} epochs",
+        f"acc {accuracy:.1%}" if accuracy is not None else "acc n/a",
+        f"{entry['size'] / 1e6:.1f} MB",
+        time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created_at"])),
+    ])
+
+
+@st.fragment(run_every=2)
+def training_status(job_id):
+    """
+    Polls the background job and shows its progress.
+    Reruns the whole page once the job finishes so the model UI appears.
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+
+    if job is None:
+        return
+
+    if job.state == "queued":
+        st.info(f"Job {job.id} is queued (position {manager.queue_position(job.id)}).")
+    elif job.state == "running":
+        latest = job.latest
+        if latest is None:
+            st.info(f"Job {job.id} is starting...")
+            st.progress(0.0)
+        else:
+            loss = "n/a" if latest["loss"] is None else f"{latest['loss']:.4f}"
+            val_loss = "n/a" if latest.get("val_loss") is None else f"{latest['val_loss']:.4f}"
+            st.progress(latest["epoch"] / latest["max_epochs"])
+            st.write(
+                f"Epoch {latest['epoch']}/{latest['max_epochs']} · loss {loss} · val loss {val_loss} · "
+                f"{latest['samples_per_sec']:.0f} samples/sec"
+            )
+    elif job.state == "finished":
+        if job.metrics.get("stopped_early"):
+            st.info(f"Stopped early after {job.metrics['epochs']} of {job.epochs} epochs.")
+        if job.num_processes > 1:
+            scaling_report(job)
+    elif job.state == "failed":
+        st.error(f"Job {job.id} failed: {job.error}")
+    elif job.state == "cancelled":
+        st.warning(f"Job {job.id} was cancelled.")
+
+    if job.state in ("failed", "cancelled"):
+        if st.button("Resume Training", key=f"resume_{job.id}"):
+            manager.resume(job.id)
+            st.rerun(scope="fragment")
+
+    if not job.done:
+        if st.button("Cancel Training", key=f"cancel_{job.id}"):
+            manager.cancel(job.id)
+            st.rerun(scope="app")
+    elif job.state == "finished" and st.session_state.get("train_ckpt") != job.ckpt_path:
+        st.session_state["train_ckpt"] = job.ckpt_path
+        st.rerun(scope="app")
+
+
+def scaling_report(job):
+    """
+    Compares a data-parallel run with a stored single-process run of the same configuration.
+    """
+    baseline = get_checkpoint_store().find(job.model_name, job.dataset, {**job.hparams, "num_processes": 1})
+    throughput = job.metrics["samples_per_sec"]
+
+    if baseline is None:
+        st.info(
+            f"{job.num_processes} processes: {throughput:.0f} samples/sec. "
+            "Train the same configuration with 1 process to see scaling efficiency."
+        )
+        return
+
+    efficiency = scaling_efficiency(job.metrics, baseline["metrics"])
+    speedup = throughput / baseline["metrics"]["samples_per_sec"]
+    st.info(
+        f"{job.num_processes} processes: {throughput:.0f} samples/sec, "
+        f"{speedup:.2f}x speed-up, {efficiency:.0%} scaling efficiency."
+    )
+
+
+def optimization_panel(Model, ckpt):
+    """
+    Quantises a checkpoint on disk and reports the accuracy and latency trade-off.
+
+    Returns:
+        str: The quantisation mode to predict with, or None for the fp32 checkpoint.
+    """
+    with st.expander("Optimise for CPU inference"):
+        mode = st.selectbox("Quantisation", MODES, help="dynamic: Linear layers only. static: all layers, calibrated.")
+        export_onnx = st.checkbox("Also export ONNX")
+
+        if st.button("Optimise"):
+            with st.spinner("Quantising and evaluating..."):
+                report = optimize_checkpoint(Model, ckpt, mode, export_onnx=export_onnx)
+            st.write(
+                f"Accuracy {report['fp32_accuracy']:.2%} → {report['int8_accuracy']:.2%} "
+                f"({report['accuracy_delta']:+.2%}) · latency {report['fp32_latency_ms']:.2f} → "
+                f"{report['int8_latency_ms']:.2f} ms · size {report['fp32_size_bytes'] / 1e6:.2f} → "
+                f"{report['int8_size_bytes'] / 1e6:.2f} MB"
+            )
+            if report["rejected"]:
+                st.warning(
+                    f"Rejected: the int8 model loses more than {report['max_accuracy_drop']:.0%} accuracy, "
+                    "so it was not saved and predictions keep using the fp32 checkpoint."
+                )
+
+        if os.path.exists(artifact_path(ckpt, mode)) and st.toggle("Predict with the int8 model"):
+            return mode
+
+    return None
 
 
 def train_model_page():
     """
+    No-code trainer. Training runs as a background job and the page polls its status.
     """
     col_left, col_center, col_right = st.columns([1,4,1])
     with col_center:
         st.title("No-Code Model Trainer")
 
         model_choice = st.selectbox("Select Model", ModelRegistry.list_models())
-        
+
         if model_choice is not None:
             Model = ModelRegistry.get(model_choice)
             dataset_choice = st.selectbox("Select Dataset", Model.supported_datasets())
-            
+
             ckpt = None
 
             action = st.radio(
                 "Select choice:",
-                ("Train New Model", "Upload Existing Model")
+                ("Train New Model", "Load Stored Model", "Upload Existing Model")
             )
 
             if action == "Train New Model":
                 epochs = st.slider("Epochs", min_value=1, max_value=10, value=3)
 
+                with st.expander("Data loading & parallelism"):
+                    default_profile = os.getenv("LOADER_PROFILE", "auto")
+                    if default_profile not in LoaderConfig.PROFILES:
+                        st.warning(
+                            f"Unknown LOADER_PROFILE '{default_profile}', expected one of "
+                            f"{LoaderConfig.PROFILES}; using 'auto'."
+                        )
+                        default_profile = "auto"
+                    profile = st.selectbox(
+                        "Profile",
+                        LoaderConfig.PROFILES,
+                        index=LoaderConfig.PROFILES.index(default_profile),
+                    )
+                    batch_size = st.select_slider("Batch size", options=[16, 32, 64, 128, 256], value=32)
+
+                    max_processes = os.cpu_count() or 1
+                    num_processes = 1
+                    if max_processes > 1:
+                        num_processes = st.slider(
+                            "CPU processes (data-parallel)",
+                            min_value=1,
+                            max_value=max_processes,
+                            value=1,
+                            help="Trains with DDP over gloo; each process gets a shard of the data.",
+                        )
+
+                    loader_config = LoaderConfig.from_profile(
+                        profile, processes=num_processes, batch_size=batch_size
+                    )
+                    st.caption(repr(loader_config))
+
+                with st.expander("Training options"):
+                    train_options = {
+                        "precision": st.selectbox(
+                            "Precision", ["fp32", "bf16"], help="bf16 uses bfloat16 autocast, also on the CPU."
+                        ),
+                        "accumulate_grad_batches": st.select_slider(
+                            "Gradient accumulation (batches per step)", options=[1, 2, 4, 8], value=1
+                        ),
+                    }
+                    if st.checkbox("Stop early when validation loss stops improving", value=True):
+                        train_options["patience"] = st.slider("Patience (epochs)", min_value=1, max_value=5, value=2)
+
+                retrain = st.checkbox("Retrain even if an identical run is stored")
+
                 if st.button("Start Training"):
-                    ckpt = train_model(model_choice, epochs)
+                    hparams = {
+                        "epochs": epochs,
+                        "batch_size": loader_config.batch_size,
+                        "num_processes": num_processes,
+                        **train_options,
+                    }
+                    stored = get_checkpoint_store().find(model_choice, dataset_choice, hparams)
+
+                    if stored is not None and not retrain:
+                        st.session_state.pop("train_job", None)
+                        st.session_state["train_ckpt"] = stored["path"]
+                        st.info(f"Loaded identical stored run: {checkpoint_label(stored)}")
+                    else:
+                        st.session_state["train_job"] = get_job_manager().submit(
+                            model_choice,
+                            epochs,
+                            dataset=dataset_choice,
+                            loader_config=loader_config,
+                            num_processes=num_processes,
+                            train_options=train_options,
+                        )
+                        st.session_state.pop("train_ckpt", None)
+
+                if "train_job" in st.session_state:
+                    training_status(st.session_state["train_job"])
+
+                ckpt = st.session_state.get("train_ckpt")
+                if ckpt is not None:
                     st.success(f"Checkpoint: {ckpt}")
+            elif action == "Load Stored Model":
+                entries = get_checkpoint_store().list_checkpoints(model_choice)
+
+                if not entries:
+                    st.info("No stored checkpoints for this model yet.")
+                else:
+                    entry = st.selectbox("Stored checkpoints", entries, format_func=checkpoint_label)
+                    ckpt = entry["path"]
             else:
                 ckpt = st.file_uploader("Upload a .ckpt file", type="ckpt")
 
             if ckpt is not None:
-                Model.render_ui(ckpt)
\ No newline at end of file
+                try:
+                    variant = optimization_panel(Model, ckpt) if isinstance(ckpt, str) else None
+                    Model.render_ui(ckpt, variant=variant)
+                except FileNotFoundError:
+                    # Stored checkpoints can be evicted by another session
+                    st.session_state.pop("train_ckpt", None)
+                    st.warning("This checkpoint is no longer stored. Train a new model or pick another one.")
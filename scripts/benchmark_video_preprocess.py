@@ -0,0 +1,169 @@
+"""
+Benchmarks the fused video preprocessing against the torchvision Compose pipeline.
+
+Each pipeline runs in a fresh process over the same clips (encoded JPEG frames
+from a dataset root, or synthetic ones), reporting time per clip, peak RSS and
+the largest difference from the Compose output.
+
+Usage (from the repo root):
+    python scripts/benchmark_video_preprocess.py --root data/demo_dataset
+    python scripts/benchmark_video_preprocess.py --resolution 1080 1920 --frames 16
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import queue
+import resource
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+import torch
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from views.demos.video_demo.video_backend import get_preprocessor
+
+
+PIPELINES = ["compose", "fused", "fused-encoded", "fused-draft"]
+
+
+def synthetic_clips(num_clips, num_frames, height, width):
+    """
+    Smooth random frames encoded as JPEG, so decoding cost is realistic.
+    """
+    clips = []
+    for _ in range(num_clips):
+        clip = []
+        for _ in range(num_frames):
+            small = (np.random.rand(height // 16 + 1, width // 16 + 1, 3) * 255).astype(np.uint8)
+            image = Image.fromarray(small).resize((width, height), Image.BILINEAR)
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=90)
+            clip.append(buffer.getvalue())
+        clips.append(clip)
+    return clips
+
+
+def dataset_clips(root_path, num_clips, num_frames, template="img_{:05d}.jpg"):
+    """
+    The first `num_frames` encoded frames of the first `num_clips` videos in the annotation file.
+    """
+    clips = []
+    with open(os.path.join(root_path, "annotations.txt"), "r", encoding="utf-8") as f:
+        rows = [line.split() for line in f if line.strip()][:num_clips]
+
+    for name, start, end, *_ in rows:
+        clip = []
+        for idx in range(int(start), min(int(end), int(start) + num_frames - 1) + 1):
+            with open(os.path.join(root_path, name, template.format(idx)), "rb") as frame:
+                clip.append(frame.read())
+        clips.append(clip)
+    return clips
+
+
+def _decode_pil(clip):
+    return [Image.open(io.BytesIO(frame)).convert("RGB") for frame in clip]
+
+
+def run_pipeline(name, clips, image_size, repeats):
+    """
+    Time one pipeline over `clips`, including JPEG decoding.
+
+    Returns:
+        dict: Milliseconds per clip, peak RSS and its growth during the run
+        in MB, and the outputs of the first clip.
+    """
+    preprocess = get_preprocessor(image_size, fused=name != "compose", draft=name == "fused-draft")
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+    outputs = None
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for clip in clips:
+            frames = clip if name in ("fused-encoded", "fused-draft") else _decode_pil(clip)
+            out = preprocess(frames)
+            if outputs is None:
+                outputs = out
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    return {
+        "pipeline": name,
+        "ms_per_clip": elapsed / (repeats * len(clips)) * 1000,
+        "peak_rss_mb": peak_rss,
+        "rss_growth_mb": peak_rss - rss_before,
+        # As an array, since a tensor is sent by shared-memory handle and dies with this process
+        "first_output": outputs.numpy(),
+    }
+
+
+def _worker(results, *args):
+    try:
+        results.put(run_pipeline(*args))
+    except Exception as e:
+        results.put({"pipeline": args[0], "error": repr(e)})
+
+
+def _wait_for_result(name, results, process):
+    # Poll, so a pipeline process that crashes or is killed does not hang the benchmark
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            if not process.is_alive():
+                try:
+                    return results.get(timeout=1.0)
+                except queue.Empty:
+                    return {"pipeline": name, "error": f"Process exited with code {process.exitcode}"}
+
+
+def benchmark(clips, image_size=299, repeats=3):
+    """
+    Run every pipeline in its own process and compare the outputs with "compose".
+    Pipelines that fail are reported with an "error" instead.
+
+    Returns:
+        list: One result dict per pipeline.
+    """
+    ctx = mp.get_context("spawn")
+    rows = []
+
+    for name in PIPELINES:
+        results = ctx.Queue()
+        process = ctx.Process(target=_worker, args=(results, name, clips, image_size, repeats))
+        process.start()
+        rows.append(_wait_for_result(name, results, process))
+        process.join()
+
+    reference = rows[0].pop("first_output", None)
+    for row in rows[1:]:
+        output = row.pop("first_output", None)
+        if reference is None or output is None:
+            continue
+        row["max_abs_diff"] = float(np.abs(output - reference).max())
+        row["speedup"] = rows[0]["ms_per_clip"] / row["ms_per_clip"]
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fused vs Compose video preprocessing.")
+    parser.add_argument("--root", default=None, help="Dataset root; synthetic frames are used if omitted.")
+    parser.add_argument("--clips", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--resolution", type=int, nargs=2, metavar=("HEIGHT", "WIDTH"), default=(720, 1280))
+    parser.add_argument("--image-size", type=int, default=299)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.root:
+        clips = dataset_clips(args.root, args.clips, args.frames)
+    else:
+        clips = synthetic_clips(args.clips, args.frames, *args.resolution)
+
+    print(json.dumps(benchmark(clips, args.image_size, args.repeats), indent=2))
@@ -1,21 +1,91 @@
 import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+
 import openai
 import chromadb
 
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
 
+from embedding_pipeline import EmbeddingPipeline
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from views.chatbot.embeddings import EMBEDDING_BACKENDS, DEFAULT_LOCAL_MODEL, collection_name
+from views.chatbot import embeddings as embedding_backends
+from views.chatbot.lexical_index import LexicalIndex
+
+
+UPSERT_BATCH_SIZE = 1000
+FILE_SECTION = re.compile(r'<file path="([^"]+)">\n(.*?)</file>', re.DOTALL)
 
-def build_index(xml_path, persist_dir="chroma_db"):
+
+def split_sections(text):
     """
-    Builds a Chroma vector database from a given XML document using OpenAI embeddings. 
+    Splits the Repomix XML dump into one section per `<file path=...>` block.
+    Everything before the first file block (summary, directory tree) is kept
+    as its own section so nothing is dropped from the index.
 
     Args:
-        xml_path: Path to XML file.
-        persist_dir: Directory where the Chroma DB will be saved. 
+        text: Contents of the XML file.
+
+    Returns:
+        list: (path, content) tuples.
+    """
+    sections = []
+
+    first = FILE_SECTION.search(text)
+    header = text[:first.start()] if first else text
+    if header.strip():
+        sections.append(("pykale.xml", header))
+
+    for match in FILE_SECTION.finditer(text):
+        sections.append((match.group(1), match.group(2)))
+
+    return sections
+
+
+def chunk_sections(sections, chunk_size=1000, chunk_overlap=100):
+    """
+    Splits each section into chunks and keys every chunk by a content hash,
+    so unchanged chunks keep the same ID across runs.
+
+    Args:
+        sections: (path, content) tuples from `split_sections`.
+        chunk_size: Maximum characters per chunk.
+        chunk_overlap: Characters shared between neighbouring chunks.
+
+    Returns:
+        dict: Chunk ID -> (text, metadata).
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+    chunks = {}
+    for path, content in sections:
+        for chunk in text_splitter.split_text(content):
+            chunk_id = hashlib.sha256(f"{path}\0{chunk}".encode("utf-8")).hexdigest()
+            chunks[chunk_id] = (chunk, {"source": "pykale.xml", "path": path})
+
+    return chunks
+
+
+def get_embeddings(embedder, model_name=DEFAULT_LOCAL_MODEL):
+    """
+    Returns the embedding function used to build the index.
+
+    Args:
+        embedder: "openai" for OpenAI embeddings, "transformer" for a local
+            encoder, "hashing" for the offline stand-in.
+        model_name: Model used by the "transformer" backend.
     """
+    if embedder != "openai":
+        return embedding_backends.get_embeddings(embedder, model_name=model_name)
 
     # Load env variables
     load_dotenv()
@@ -24,36 +94,119 @@ def build_index(xml_path, persist_dir="chroma_db"):
     if not openai.api_key:
         raise ValueError("OPENAI_API_KEY not found in .env")
 
+    return embedding_backends.get_embeddings(embedder, api_key=openai.api_key)
+
+
+def build_index(
+    xml_path,
+    persist_dir="chroma_db",
+    incremental=True,
+    embedder="openai",
+    batch_size=64,
+    max_workers=4,
+    model_name=DEFAULT_LOCAL_MODEL,
+):
+    """
+    Builds a Chroma vector database from a given XML document.
+
+    In incremental mode only chunks whose content hash is not already in the
+    collection are embedded, and chunks that no longer exist are deleted once
+    the new ones are stored.
+    A BM25 lexical index over the same chunks is written next to the DB.
+    Embeddings are computed in concurrent batches and checkpointed in
+    `persist_dir`, so an interrupted build picks up where it stopped.
+
+    Args:
+        xml_path: Path to XML file.
+        persist_dir: Directory where the Chroma DB will be saved.
+        incremental: If False, drop the collection and re-embed every chunk.
+        embedder: Embedding backend, see `get_embeddings`.
+        batch_size: Chunks per embedding request.
+        max_workers: Maximum concurrent embedding requests.
+        model_name: Model used by the "transformer" backend.
+    """
+    embeddings = get_embeddings(embedder, model_name)
+    collection_id = collection_name(embedder, model_name=model_name)
+
     # Read file content
     with open(xml_path, "r", encoding="utf-8") as f:
         text = f.read()
 
-    # Split text into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100
-    )
-
-    chunks = text_splitter.split_text(text)
+    # Split text into per-file, content-hashed chunks
+    chunks = chunk_sections(split_sections(text))
 
     # Init Chroma client
     chroma_client = chromadb.PersistentClient(path=persist_dir)
 
-    # Use OpenAI embeddings to convert chunks into vectors
-    embeddings = OpenAIEmbeddings(openai_api_key=openai.api_key)
-    
-    # Build vector store
-    Chroma.from_texts(
-        texts=chunks,
-        embedding=embeddings,
-        metadatas=[{"source": "pykale.xml"} for _ in chunks],
-        collection_name="pykale_xml",
-        client=chroma_client,
+    # Since chromadb 0.6, list_collections() returns collection names
+    if not incremental and collection_id in chroma_client.list_collections():
+        chroma_client.delete_collection(collection_id)
+
+    collection = chroma_client.get_or_create_collection(collection_id)
+
+    existing_ids = set(collection.get(include=[])["ids"])
+    new_ids = [chunk_id for chunk_id in chunks if chunk_id not in existing_ids]
+    stale_ids = list(existing_ids - chunks.keys())
+
+    # Embed new chunks
+    # Keyed like the collection, so a resumed run never mixes vectors from another backend or model
+    checkpoint_path = os.path.join(persist_dir, f"embedding_checkpoint_{collection_id}.sqlite")
+    pipeline = EmbeddingPipeline(
+        embeddings,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        checkpoint_path=checkpoint_path,
+    )
+
+    start = time.perf_counter()
+    vectors = pipeline.run(new_ids, [chunks[chunk_id][0] for chunk_id in new_ids])
+    elapsed = time.perf_counter() - start
+
+    for i in range(0, len(new_ids), UPSERT_BATCH_SIZE):
+        batch_ids = new_ids[i:i + UPSERT_BATCH_SIZE]
+        collection.upsert(
+            ids=batch_ids,
+            embeddings=[vectors[chunk_id] for chunk_id in batch_ids],
+            documents=[chunks[chunk_id][0] for chunk_id in batch_ids],
+            metadatas=[chunks[chunk_id][1] for chunk_id in batch_ids],
+        )
+
+    # Stale chunks go only once their replacements are stored, so a failed run leaves the collection usable
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+
+    # Everything is in the collection, the checkpoint is no longer needed
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    # The BM25 index needs no embeddings, so it is always rebuilt in full
+    LexicalIndex.build([chunk for chunk, _ in chunks.values()]).save(
+        os.path.join(persist_dir, "lexical_index.npz")
     )
 
+    print(f"Embedded {len(new_ids)} new chunks in {elapsed:.2f}s "
+          f"({len(new_ids) / max(elapsed, 1e-9):.1f} chunks/s), "
+          f"deleted {len(stale_ids)} stale chunks, {len(chunks) - len(new_ids)} unchanged.")
     print(f"Chroma DB built in: {persist_dir}")
 
 
 if __name__ == "__main__":
-    xml_path = "./data/pykale.xml" 
-    build_index(xml_path)
+    parser = argparse.ArgumentParser(description="Build the PyKale Chroma index.")
+    parser.add_argument("--xml-path", default="./data/pykale.xml")
+    parser.add_argument("--persist-dir", default="chroma_db")
+    parser.add_argument("--full", action="store_true", help="Rebuild the collection from scratch.")
+    parser.add_argument("--embedder", choices=EMBEDDING_BACKENDS, default="openai")
+    parser.add_argument("--model-name", default=DEFAULT_LOCAL_MODEL)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    build_index(
+        args.xml_path,
+        args.persist_dir,
+        incremental=not args.full,
+        embedder=args.embedder,
+        batch_size=args.batch_size,
+        max_workers=args.max_workers,
+        model_name=args.model_name,
+    )
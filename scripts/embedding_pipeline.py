@@ -0,0 +1,109 @@
+import json
+import time
+import random
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class EmbeddingPipeline:
+    """
+    Embeds texts in fixed-size batches on a bounded thread pool.
+
+    Failed batches are retried with exponential backoff, and every finished
+    batch is written to a sqlite checkpoint so an interrupted build resumes
+    without re-embedding what it already paid for.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        batch_size=64,
+        max_workers=4,
+        max_retries=5,
+        backoff=1.0,
+        checkpoint_path=None,
+    ):
+        """
+        Args:
+            embeddings: A LangChain `Embeddings` object.
+            batch_size: Texts sent per embedding request.
+            max_workers: Maximum number of concurrent requests.
+            max_retries: Attempts per batch before giving up.
+            backoff: Base delay in seconds, doubled after every failed attempt.
+            checkpoint_path: Optional sqlite file recording finished vectors.
+        """
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.checkpoint_path = checkpoint_path
+
+    def _embed_batch(self, texts):
+        for attempt in range(self.max_retries):
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception:
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    def _open_checkpoint(self):
+        db = sqlite3.connect(self.checkpoint_path)
+        db.execute("CREATE TABLE IF NOT EXISTS vectors (id TEXT PRIMARY KEY, vector TEXT)")
+        db.commit()
+        return db
+
+    def run(self, ids, texts):
+        """
+        Embeds `texts`, skipping any IDs already present in the checkpoint.
+
+        Args:
+            ids: Unique ID per text.
+            texts: Texts to embed.
+
+        Returns:
+            dict: ID -> embedding vector.
+        """
+        vectors = {}
+        db = self._open_checkpoint() if self.checkpoint_path else None
+
+        if db is not None:
+            wanted = set(ids)
+            for chunk_id, vector in db.execute("SELECT id, vector FROM vectors"):
+                if chunk_id in wanted:
+                    vectors[chunk_id] = json.loads(vector)
+
+        pending = [(i, t) for i, t in zip(ids, texts) if i not in vectors]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    pool.submit(self._embed_batch, [text for _, text in batch]): batch
+                    for batch in batches
+                }
+
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        batch_vectors = future.result()
+                    except Exception:
+                        for other in futures:
+                            other.cancel()
+                        raise
+
+                    results = list(zip([chunk_id for chunk_id, _ in batch], batch_vectors))
+                    vectors.update(results)
+
+                    if db is not None:
+                        db.executemany(
+                            "INSERT OR REPLACE INTO vectors VALUES (?, ?)",
+                            [(chunk_id, json.dumps(vector)) for chunk_id, vector in results],
+                        )
+                        db.commit()
+        finally:
+            if db is not None:
+                db.close()
+
+        return vectors
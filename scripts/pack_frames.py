@@ -0,0 +1,40 @@
+"""
+Packs a video frame dataset into one file per video for faster clip loading.
+
+The video demos read their datasets relative to the directory the app is
+started from (the repo root for `streamlit run app/main.py`):
+data/demo_dataset, datasets/demo_dataset and datasets/demo_dataset_multilabel.
+
+Usage (from the repo root):
+    python scripts/pack_frames.py --root data/demo_dataset --format jpeg
+    python scripts/pack_frames.py --root datasets/demo_dataset --format raw --size 320 320
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from views.demos.video_demo.frame_store import PACK_FORMATS, pack_dataset
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack img_{:05d}.jpg frame folders into indexed shards.")
+    parser.add_argument("--root", required=True, help="Dataset root directory.")
+    parser.add_argument("--annotations", default=None, help="Annotation file (default: <root>/annotations.txt).")
+    parser.add_argument("--format", choices=PACK_FORMATS, default="jpeg")
+    parser.add_argument("--size", type=int, nargs=2, metavar=("HEIGHT", "WIDTH"), default=None,
+                        help="Resize frames for raw packs.")
+    parser.add_argument("--force", action="store_true", help="Repack videos that are already packed.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = pack_dataset(
+        args.root,
+        args.annotations or os.path.join(args.root, "annotations.txt"),
+        fmt=args.format,
+        size=args.size,
+        force=args.force,
+    )
+    print(f"Packed {len(manifest['videos'])} videos in {time.perf_counter() - start:.1f}s")